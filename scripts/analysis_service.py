@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+from fetch_data import load_session
+from lap_index import get_lap_index
+
+import fastest_lap_comparison
+import final_ranking
+import tyre_analysis
+import top2_drivers_best_laps_comparison
+import positions_changed_during_the_race
+import race_trace
+import qualifying_analysis
+import consistency_analysis
+
+# pyarrow is optional, without it only the JSON format is served
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Local HTTP service exposing the tabular results behind the dashboard charts,
+# so notebooks and other tools can reuse one computation per race.
+#
+#   GET /api/<year>/<gp>/<session>/<resource>?format=json|arrow
+#
+# e.g. /api/2024/Monza/R/consistency or /api/2024/Monza/R/telemetry?drivers=VER,NOR
+
+TELEMETRY_COLUMNS = ['Distance', 'Speed', 'RPM', 'nGear', 'Throttle', 'Brake', 'Time']
+
+
+class NotFoundError(Exception):
+    """The requested data does not exist in the session, answered with 404."""
+
+
+def fastest_laps_table(session, params):
+    # each driver's fastest lap and its delta to the fastest lap of the session
+    _, fastest_laps = fastest_lap_comparison.calculate_drivers_delta_time_compared_to_pole(session)
+    columns = ['Driver', 'Team', 'LapNumber', 'LapTime', 'LapTimeDelta', 'Compound']
+    return pd.DataFrame(fastest_laps[columns])
+
+
+def consistency_table(session, params):
+    return consistency_analysis.get_consistency_table(session)
+
+
+def stints_table(session, params):
+    return tyre_analysis.get_stint_table(session)
+
+
+def classification_table(session, params):
+    results = final_ranking.get_final_classification(session)
+    columns = ['PositionLabel', 'Abbreviation', 'FullName', 'TeamName', 'GridPosition', 'Status', 'Points']
+    return pd.DataFrame(results[[c for c in columns if c in results.columns]])
+
+
+def positions_table(session, params):
+    # lap by driver matrix, the lap number becomes a normal column for the output
+    return positions_changed_during_the_race.get_position_matrix(session).reset_index()
+
+
+def telemetry_table(session, params):
+    # speed traces of the fastest lap of the requested drivers, by default the two fastest of the session
+    drivers = [d for d in params.get('drivers', [''])[0].split(',') if d]
+
+    if not drivers:
+        _, _, driver_data, _, _ = top2_drivers_best_laps_comparison.prepare_driver_data_for_plotting(session)
+        traces = {drv: info['car'] for drv, info in driver_data.items()}
+    else:
+        traces = {}
+        index = get_lap_index(session)
+        for drv in drivers:
+            lap = index.fastest(index.driver(drv))
+            if lap is None:
+                raise NotFoundError(f"no timed lap for driver '{drv}'")
+            traces[drv] = lap.get_car_data().add_distance()
+
+    frames = []
+    for drv, car in traces.items():
+        frame = pd.DataFrame(car[[c for c in TELEMETRY_COLUMNS if c in car.columns]])
+        frame.insert(0, 'Driver', drv)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def race_trace_table(session, params):
+    # gap to leader, interval and gap to reference pace per driver and lap
+    reference_pace = params.get('reference_pace', [None])[0]
+    return race_trace.get_race_trace_table(
+        session, reference_pace=float(reference_pace) if reference_pace else None)
+
+
+def qualifying_table(session, params):
+    # best sectors, theoretical best lap and Q1/Q2/Q3 progression per driver
+    return qualifying_analysis.get_qualifying_summary(session)
+
+
+RESOURCES = {
+    'fastest-laps': fastest_laps_table,
+    'consistency': consistency_table,
+    'stints': stints_table,
+    'classification': classification_table,
+    'positions': positions_table,
+    'telemetry': telemetry_table,
+    'race-trace': race_trace_table,
+    'qualifying': qualifying_table,
+}
+
+
+class _LRUStore:
+    """
+    Thread-safe LRU mapping that computes every missing key only once.
+
+    Concurrent requests for the same key wait for the first one to finish
+    instead of repeating the work, so many clients asking for the same
+    race share a single session load and a single computation.
+    """
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # another thread may have computed it while we were waiting
+            with self._lock:
+                if key in self._items:
+                    return self._items[key]
+
+            try:
+                value = compute()
+                with self._lock:
+                    self._items[key] = value
+                    while len(self._items) > self.max_items:
+                        self._items.popitem(last=False)
+                return value
+            finally:
+                # also when compute() failed, otherwise the lock of every failed key stays around
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+
+# loaded sessions are large, keep only a few of them in memory
+_sessions = _LRUStore(max_items=6)
+# serialized responses are small, keep many
+_responses = _LRUStore(max_items=512)
+
+
+def get_session(year, gp, session_type):
+    return _sessions.get((year, gp.lower(), session_type.upper()),
+                         lambda: load_session(year, gp, session_type.upper()))
+
+
+def _prepare_for_output(df):
+    # timedeltas are sent as seconds, which every client can read
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_timedelta64_dtype(df[col]):
+            df[col] = df[col].dt.total_seconds()
+    df.columns = [str(c) for c in df.columns]
+    return df
+
+
+def serialize(df, fmt):
+    """
+    Serialize a table as JSON records or as an Arrow IPC stream.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The table to send. Timedelta columns are converted to seconds.
+    fmt : str
+        Either "json" or "arrow".
+
+    Returns
+    -------
+    body : bytes
+        The encoded table.
+    content_type : str
+        The matching HTTP content type.
+    """
+    df = _prepare_for_output(df)
+
+    if fmt == 'arrow':
+        if pa is None:
+            raise ValueError("the arrow format requires pyarrow to be installed")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), 'application/vnd.apache.arrow.stream'
+
+    if fmt == 'json':
+        body = df.to_json(orient='records', date_format='iso').encode('utf-8')
+        return body, 'application/json'
+
+    raise ValueError(f"unknown format '{fmt}', use 'json' or 'arrow'")
+
+
+def get_response(year, gp, session_type, resource, params, fmt):
+    """
+    Return the cached encoded response for one analysis resource.
+
+    The response is computed on first request and cached per session,
+    resource, parameters and format, together with its ETag.
+
+    Returns
+    -------
+    response : tuple
+        (body, content_type, etag)
+    """
+    key = (year, gp.lower(), session_type.upper(), resource,
+           tuple(sorted((k, tuple(v)) for k, v in params.items())), fmt)
+
+    def compute():
+        session = get_session(year, gp, session_type)
+        body, content_type = serialize(RESOURCES[resource](session, params), fmt)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        return body, content_type, etag
+
+    return _responses.get(key, compute)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip('/').split('/')]
+        params = parse_qs(url.query)
+
+        if parts == ['api']:
+            return self._send_json(200, {'resources': sorted(RESOURCES)})
+
+        if len(parts) != 5 or parts[0] != 'api':
+            return self._send_json(404, {'error': "use /api/<year>/<gp>/<session>/<resource>"})
+
+        _, year, gp, session_type, resource = parts
+        if not year.isdigit():
+            return self._send_json(400, {'error': f"invalid year '{year}'"})
+        if resource not in RESOURCES:
+            return self._send_json(404, {'error': f"unknown resource '{resource}'",
+                                         'resources': sorted(RESOURCES)})
+
+        fmt = params.pop('format', ['json'])[0]
+        if fmt not in ('json', 'arrow'):
+            return self._send_json(400, {'error': f"unknown format '{fmt}', use 'json' or 'arrow'"})
+        if fmt == 'arrow' and pa is None:
+            return self._send_json(406, {'error': "the arrow format requires pyarrow to be installed"})
+        if 'reference_pace' in params:
+            try:
+                float(params['reference_pace'][0])
+            except ValueError:
+                return self._send_json(400, {'error': f"invalid reference_pace '{params['reference_pace'][0]}', "
+                                                      "use seconds per lap"})
+
+        try:
+            body, content_type, etag = get_response(int(year), gp, session_type, resource, params, fmt)
+        except NotFoundError as e:
+            return self._send_json(404, {'error': str(e)})
+        except Exception as e:
+            return self._send_json(500, {'error': str(e)})
+
+        # conditional request: the client already has this exact table
+        if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'max-age=3600')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host='127.0.0.1', port=8050):
+    """
+    Start the analysis service and block until it is interrupted.
+
+    Parameters
+    ----------
+    host : str, default '127.0.0.1'
+        Interface to bind, only the local machine by default.
+    port : int, default 8050
+        Port to listen on.
+    """
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    print(f"Serving F1 analysis on http://{host}:{port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve F1 analysis tables as JSON or Arrow.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -3,17 +3,21 @@ from datetime import datetime
 import fastf1
 
 # modules
-from fetch_data import load_session
+from fetch_data import load_session, setup_fastf1_cache
 
 import fastest_lap_comparison
 import final_ranking
 import tyre_analysis
 import top2_drivers_best_laps_comparison
 import positions_changed_during_the_race
+import race_trace
+import qualifying_analysis
+import track_map
+import consistency_analysis
 
 
-# enable FastF1 cache
-fastf1.Cache.enable_cache("external_data/fastf1")
+# enable FastF1 cache (same project-root directory used by load_session)
+setup_fastf1_cache()
 
 @st.cache_data
 def get_gp_names_for_year(year: int):
@@ -73,6 +77,17 @@ if st.button("Start Race Analysis"):
             * **Large jumps** between drivers often indicate different car performances, where some cars struggled in comparison to others.
         """)
 
+        st.subheader("Theoretical Best Laps and Progress through Q1, Q2 and Q3")
+
+        quali_summary = qualifying_analysis.get_qualifying_summary(quali_session)
+        st.dataframe(quali_summary.round(3), hide_index=True)
+
+        st.markdown("""
+        * **Theoretical Best:** The sum of a driver's best three sectors, even if they were set on different laps.
+        * **Gap to Ideal:** How much time the driver left on the table on their best lap. A small gap means they put the lap together.
+        * **Q1 to Q2 / Q2 to Q3:** Lap time gained from one segment to the next (track evolution, fresh tyres and lower fuel).
+        """)
+
                 
         # Positions Changed
 
@@ -88,11 +103,26 @@ if st.button("Start Race Analysis"):
         * **Battles:** Look for areas where two lines criss-cross repeatedly; this indicates a fight for position.
         * **Retirements:** If a line stops midway through the chart, that driver DNF'd (Did Not Finish).
         """)
+
+        # Race Trace
+
+        st.subheader("Race Trace")
+
+        fig_trace = race_trace.plot_race_trace(race_session)
+        st.pyplot(fig_trace)
+
+        st.markdown("""
+        The position chart shows the order, the race trace shows the **time gaps** behind it.
+
+        * **The Reference:** Every line is the driver's elapsed time compared to the winner's average lap time. A flat line means the driver ran at exactly that pace.
+        * **Steps:** A sudden drop of 20 seconds or more is a pit stop.
+        * **Safety Car:** When all lines drop and bunch together, the field was neutralised and the gaps were wiped out.
+        """)
         # Consistency Analysis 
         st.subheader("Driver Consistency Analysis")
         
         # Calculate consistency from module
-        consistency_df = fastest_lap_comparison.get_driver_consistency(race_session)
+        consistency_df = consistency_analysis.get_consistency_table(race_session)
         
         # Splits layout into two columns: Metric and Table
         col1, col2 = st.columns([1, 2])
@@ -103,16 +133,21 @@ if st.button("Start Race Analysis"):
                 st.metric(
                     label="Most Consistent Driver",
                     value=most_consistent['Driver'],
-                    delta=f"±{most_consistent['Consistency (Std Dev) [s]']}s"
+                    delta=f"±{most_consistent['Consistency (MAD) [s]']}s"
                 )
-                st.info("Lower Standard Deviation (Std Dev) means more consistent lap times.")
+                st.info("Lower median absolute deviation (MAD) means more consistent lap times.")
         
         with col2:
             st.dataframe(consistency_df, hide_index=True)
             
         st.markdown("""
         **Why this matters:**
-        Consistency is key in race pace. A driver with a **low standard deviation** is driving as best as possible, hitting the same lap times repeatedly, which is crucial for tyre management and strategy execution.
+        Consistency is key in race pace. A driver with a **low deviation** is driving as best as possible, hitting the same lap times repeatedly, which is crucial for tyre management and strategy execution.
+
+        * **Fuel Corrected:** Cars get lighter and faster as fuel burns off, lap times are corrected for it before comparing them.
+        * **Per Stint:** Every lap is compared with its own stint, so a tyre change is not counted as inconsistency.
+        * **MAD:** The median absolute deviation ignores the odd lap lost in traffic; those laps are counted separately as **Outlier Laps**.
+        * **Rolling Std:** The spread over 5 consecutive laps, unaffected by the slow drift of tyre wear.
         """)
         
         # Tyre Analysis
@@ -177,6 +212,16 @@ if st.button("Start Race Analysis"):
         * **Traction (Exit):** Observe how steeply the line rises after the dotted line. A steeper slope means the driver was able to get back on full throttle earlier.
         """)
 
+        # Track map
+        st.subheader("Speed on Track (Fastest Lap of the Race)")
+
+        fig5 = track_map.plot_track_map(race_session)
+        st.pyplot(fig5)
+
+        st.markdown("""
+        The circuit is coloured by the speed of the fastest lap of the race. Dark sections are the slow corners and braking zones, bright sections the straights where the car reaches top speed.
+        """)
+
         st.success("Analysis completed!")
 
     except Exception as e:
@@ -0,0 +1,340 @@
+import argparse
+import os
+import pickle
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import fastf1
+
+# Single place that owns the FastF1 cache. Before this, app.py and fetch_data.py
+# enabled two different directories (one relative to the working directory, one
+# relative to the project root), so the same race could be downloaded twice.
+
+# project root is the parent of scripts/, so the path does not depend on where streamlit is started from
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / "external_data" / "fastf1"
+
+# default disk budget for the cached event data, can be overridden with an env variable
+DEFAULT_MAX_CACHE_SIZE_GB = float(os.environ.get("F1_CACHE_MAX_GB", 5))
+
+_enable_lock = threading.Lock()
+_cache_enabled = False
+
+
+def enable_cache():
+    """
+    Enable the FastF1 cache in the project cache directory.
+
+    The directory is created if it does not exist. Calling this function
+    more than once is cheap: FastF1 is only configured the first time,
+    so repeated calls from `load_session` or the dashboard do not
+    re-create the HTTP cache session.
+
+    Returns
+    -------
+    cache_dir : pathlib.Path
+        The resolved cache directory used by FastF1.
+    """
+    global _cache_enabled
+
+    with _enable_lock:
+        if not _cache_enabled:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fastf1.Cache.enable_cache(str(CACHE_DIR))
+            _cache_enabled = True
+
+    return CACHE_DIR
+
+
+def get_event_cache_dir(session):
+    """
+    Return the cache directory holding all sessions of the session's event.
+
+    FastF1 stores its parsed data as `<cache>/<year>/<event>/<session>/*.ff1pkl`,
+    so the event folder is the parent of the session's API path.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A FastF1 session (loaded or not).
+
+    Returns
+    -------
+    event_dir : pathlib.Path or None
+        The event folder inside the cache, or None if the session has no
+        API path (e.g. sessions only available through Ergast).
+    """
+    api_path = getattr(session, 'api_path', None)
+    if not api_path:
+        return None
+
+    # the leading '/static/' is dropped by FastF1 as well
+    return (CACHE_DIR / api_path[len('/static/'):]).parent
+
+
+def mark_event_used(session):
+    """
+    Record that the session's event was just used.
+
+    The modification time of the event folder is used as the "last used"
+    timestamp for the LRU eviction in `enforce_size_cap`.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        The session that was loaded.
+    """
+    event_dir = get_event_cache_dir(session)
+    if event_dir is not None and event_dir.is_dir():
+        os.utime(event_dir, None)
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+def list_cached_events():
+    """
+    List every event stored in the cache with its size and last use.
+
+    Returns
+    -------
+    events : list of dict
+        One dictionary per event folder with the keys:
+            - 'path' : pathlib.Path
+            - 'size' : int, size on disk in bytes
+            - 'last_used' : float, POSIX timestamp of the latest use
+        The list is sorted from least to most recently used.
+    """
+    events = []
+    if not CACHE_DIR.is_dir():
+        return events
+
+    for year_dir in CACHE_DIR.iterdir():
+        # only the '<year>' folders contain event data, skip the http cache database
+        if not (year_dir.is_dir() and year_dir.name.isdigit()):
+            continue
+        for event_dir in year_dir.iterdir():
+            if not event_dir.is_dir():
+                continue
+            files = [f for f in event_dir.rglob('*') if f.is_file()]
+            # newly downloaded sessions count as a use too, even if mark_event_used was never called
+            last_used = max([event_dir.stat().st_mtime] + [f.stat().st_mtime for f in files])
+            events.append({
+                'path': event_dir,
+                'size': sum(f.stat().st_size for f in files),
+                'last_used': last_used,
+            })
+
+    return sorted(events, key=lambda e: e['last_used'])
+
+
+def enforce_size_cap(max_size_gb=DEFAULT_MAX_CACHE_SIZE_GB, keep=None):
+    """
+    Evict the least recently used events until the cache fits the size cap.
+
+    Eviction works on whole events (all sessions of a Grand Prix weekend),
+    because the dashboard always needs both the qualifying and the race
+    of an event. The HTTP response database of FastF1 is not counted
+    against the cap, its expired responses are removed by
+    `prune_http_cache`.
+
+    Parameters
+    ----------
+    max_size_gb : float, default DEFAULT_MAX_CACHE_SIZE_GB
+        Maximum size of the cached event data in gigabytes.
+    keep : pathlib.Path, optional
+        An event folder that must never be evicted (e.g. the one that
+        was just loaded), even if it alone exceeds the cap.
+
+    Returns
+    -------
+    evicted : list of pathlib.Path
+        The event folders that were removed.
+    """
+    max_bytes = int(max_size_gb * 1024 ** 3)
+    events = list_cached_events()
+    total = sum(e['size'] for e in events)
+
+    evicted = []
+    for event in events:
+        if total <= max_bytes:
+            break
+        if keep is not None and event['path'] == Path(keep):
+            continue
+        shutil.rmtree(event['path'], ignore_errors=True)
+        total -= event['size']
+        evicted.append(event['path'])
+
+    # remove year folders that became empty
+    for path in {p.parent for p in evicted}:
+        if path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+
+    return evicted
+
+
+def prune_http_cache():
+    """
+    Delete the expired responses from FastF1's HTTP response database.
+
+    requests-cache never deletes expired rows by itself, so without this
+    `fastf1_http_cache.sqlite` grows with every request. The file is
+    compacted afterwards.
+
+    Returns
+    -------
+    size : int
+        Size of the database file in bytes afterwards (0 if there is none).
+    """
+    enable_cache()
+    http_session = getattr(fastf1.Cache, '_requests_session_cached', None)
+    if http_session is None:
+        return 0
+
+    http_session.cache.delete(expired=True)
+    http_session.cache.responses.vacuum()
+    path = Path(http_session.cache.db_path)
+    return path.stat().st_size if path.is_file() else 0
+
+
+def verify_cache(remove=True):
+    """
+    Check that every cached FastF1 file can be read and is up to date.
+
+    A file is reported if it cannot be unpickled, does not have the
+    structure written by FastF1, or was written by a different version
+    of the FastF1 API parser. Such files would otherwise either be
+    silently re-downloaded on every load or, if the download fails,
+    stop the application.
+
+    Parameters
+    ----------
+    remove : bool, default True
+        Delete the broken or outdated files so FastF1 downloads them
+        again on the next load.
+
+    Returns
+    -------
+    bad_files : list of pathlib.Path
+        The files that failed the check.
+    """
+    bad_files = []
+    if not CACHE_DIR.is_dir():
+        return bad_files
+
+    for cache_file in CACHE_DIR.rglob('*.ff1pkl'):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            ok = (isinstance(cached, dict)
+                  and 'data' in cached
+                  and cached.get('version') == fastf1.Cache._API_CORE_VERSION)
+        except Exception:  # any unpickling error means the file is unusable
+            ok = False
+
+        if not ok:
+            bad_files.append(cache_file)
+            if remove:
+                cache_file.unlink(missing_ok=True)
+
+    return bad_files
+
+
+def warm_up(years, session_types=("Q", "R")):
+    """
+    Prepopulate the cache with the chosen sessions of whole seasons.
+
+    Every event of the given seasons that has already taken place is
+    loaded once through `fetch_data.load_session`, so the dashboard
+    finds the data on disk instead of downloading it on first use.
+    Failures of single sessions (e.g. cancelled events, or sessions
+    that loaded without laps or telemetry) are reported and skipped.
+
+    Parameters
+    ----------
+    years : iterable of int
+        The seasons to download (e.g. [2023, 2024]).
+    session_types : iterable of str, default ("Q", "R")
+        Session codes to load for every event.
+
+    Returns
+    -------
+    failed : list of tuple
+        (year, event name, session type, error message) for every
+        session that could not be loaded.
+    """
+    # imported here because fetch_data itself depends on this module
+    from fetch_data import load_session, check_session_data
+
+    enable_cache()
+    failed = []
+    now = time.time()
+
+    for year in years:
+        schedule = fastf1.get_event_schedule(year, include_testing=False)
+        for _, event in schedule.iterrows():
+            # skip events that have not happened yet, they have no data
+            if event['EventDate'].timestamp() > now:
+                continue
+            for session_type in session_types:
+                try:
+                    session = load_session(year, event['EventName'], session_type)
+                    check_session_data(session)
+                    print(f"cached {year} {event['EventName']} {session_type}")
+                except Exception as e:
+                    failed.append((year, event['EventName'], session_type, str(e)))
+                    print(f"failed {year} {event['EventName']} {session_type}: {e}")
+
+    return failed
+
+
+def _format_size(size_bytes):
+    return f"{size_bytes / 1024 ** 2:.1f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the project's FastF1 cache.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    warm = sub.add_parser('warm-up', help="download sessions of whole seasons ahead of time")
+    warm.add_argument('years', type=int, nargs='+')
+    warm.add_argument('--sessions', nargs='+', default=["Q", "R"])
+
+    sub.add_parser('info', help="show cached events and their sizes")
+
+    verify = sub.add_parser('verify', help="find (and delete) unreadable or outdated cache files")
+    verify.add_argument('--keep', action='store_true', help="only report, do not delete")
+
+    prune = sub.add_parser('prune', help="evict least recently used events above the size cap "
+                                         "and expired HTTP responses")
+    prune.add_argument('--max-gb', type=float, default=DEFAULT_MAX_CACHE_SIZE_GB)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'warm-up':
+        failed = warm_up(args.years, args.sessions)
+        enforce_size_cap()
+        prune_http_cache()
+        print(f"done, {len(failed)} session(s) failed")
+    elif args.command == 'info':
+        events = list_cached_events()
+        for event in events:
+            print(f"{_format_size(event['size']):>10}  {event['path'].relative_to(CACHE_DIR)}")
+        print(f"{len(events)} events, {_format_size(sum(e['size'] for e in events))} in {CACHE_DIR}")
+    elif args.command == 'verify':
+        bad_files = verify_cache(remove=not args.keep)
+        for path in bad_files:
+            print(f"bad: {path.relative_to(CACHE_DIR)}")
+        print(f"{len(bad_files)} bad file(s)")
+    elif args.command == 'prune':
+        evicted = enforce_size_cap(args.max_gb)
+        for path in evicted:
+            print(f"evicted: {path.relative_to(CACHE_DIR)}")
+        print(f"HTTP cache: {_format_size(prune_http_cache())}")
+
+
+if __name__ == '__main__':
+    main()
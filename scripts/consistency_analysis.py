@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+
+from fetch_data import load_session
+from lap_index import get_lap_index
+
+# Race consistency per stint. A single std over a whole race mostly measures fuel burn-off
+# and tyre changes, so lap times are first corrected for the fuel load and then judged
+# against their own stint with robust statistics. All drivers and stints are handled by
+# grouped operations on one lap table, cheap enough to run over every race of a season.
+
+# lap time gained per lap of fuel burnt, in seconds (roughly 1.6 kg per lap at ~0.03 s/kg)
+FUEL_EFFECT_PER_LAP = 0.05
+
+# laps in the rolling window used for the local lap-to-lap spread
+ROLLING_WINDOW = 5
+
+# a lap further than this many robust standard deviations from its stint median is an outlier
+OUTLIER_THRESHOLD = 3.0
+
+# scales the MAD to the standard deviation of normally distributed lap times
+MAD_TO_STD = 1.4826
+
+# shorter stints have no meaningful spread (a one-lap stint has a MAD of exactly 0)
+MIN_STINT_LAPS = 3
+
+def get_consistency_laps(session, fuel_effect=FUEL_EFFECT_PER_LAP):
+    """
+    Return the representative race laps with fuel-corrected lap times.
+
+    Only quick, accurate laps are used (no pit in/out laps, no safety car
+    laps). Quick means within 107% of the driver's own fastest lap, so a
+    driver far off the pace is still rated. The corrected lap time removes
+    the advantage of the lighter car: every lap is made slower by the fuel
+    it no longer carries, as if the whole race had been driven with a full
+    tank.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 race session.
+    fuel_effect : float, default FUEL_EFFECT_PER_LAP
+        Lap time effect of one lap's worth of fuel in seconds.
+
+    Returns
+    -------
+    laps : pandas.DataFrame
+        One row per lap with the columns ['Driver', 'Stint', 'Compound',
+        'LapNumber', 'LapTime', 'CorrectedLapTime'], times in seconds,
+        sorted by driver and lap.
+    """
+    index = get_lap_index(session)
+    laps = index.select(index.where(driver_quick=True, accurate=True))
+
+    data = pd.DataFrame({
+        'Driver': laps['Driver'],
+        'Stint': laps['Stint'],
+        'Compound': laps['Compound'],
+        'LapNumber': laps['LapNumber'],
+        'LapTime': laps['LapTime'].dt.total_seconds(),
+    }).dropna(subset=['Stint', 'LapTime'])
+
+    data['CorrectedLapTime'] = data['LapTime'] + fuel_effect * (data['LapNumber'] - 1)
+    return data.sort_values(['Driver', 'LapNumber']).reset_index(drop=True)
+
+def compute_consistency(laps, window=ROLLING_WINDOW, outlier_threshold=OUTLIER_THRESHOLD):
+    """
+    Compute robust per-stint and per-driver consistency metrics.
+
+    Per stint, on the fuel-corrected lap times:
+
+    - MAD: median absolute deviation from the stint median. It ignores
+      the odd traffic lap or mistake that dominates a standard deviation.
+    - rolling std: mean of the standard deviation over `window`
+      consecutive laps. It measures lap-to-lap spread and is not
+      affected by the slow drift from tyre wear.
+    - outlier laps: laps further than `outlier_threshold` robust standard
+      deviations (1.4826 * MAD) from the stint median.
+
+    Stints with fewer than `MIN_STINT_LAPS` laps get no metrics and do not
+    count for the driver. The driver values are lap-weighted means of the
+    stint values (outliers are summed).
+
+    Parameters
+    ----------
+    laps : pandas.DataFrame
+        Lap table as returned by `get_consistency_laps`, sorted by lap
+        number within each stint.
+    window : int, default ROLLING_WINDOW
+        Laps in the rolling window.
+    outlier_threshold : float, default OUTLIER_THRESHOLD
+        Outlier distance in robust standard deviations.
+
+    Returns
+    -------
+    stints : pandas.DataFrame
+        One row per driver and stint with the columns ['Driver', 'Stint',
+        'Compound', 'Laps', 'Median', 'MAD', 'RollingStd', 'Outliers'].
+    drivers : pandas.DataFrame
+        One row per driver, most consistent (lowest MAD) first, with the
+        columns ['Driver', 'Laps', 'Stints', 'MAD', 'RollingStd', 'Outliers'].
+    """
+    keys = ['Driver', 'Stint']
+    grouped = laps.groupby(keys, sort=False)['CorrectedLapTime']
+
+    median = grouped.transform('median')
+    deviation = (laps['CorrectedLapTime'] - median).abs()
+    mad = deviation.groupby([laps['Driver'], laps['Stint']], sort=False).transform('median')
+
+    # too short stints are excluded: NaN metrics, no outliers
+    counted = grouped.transform('size') >= MIN_STINT_LAPS
+    mad = mad.where(counted)
+    is_outlier = deviation > outlier_threshold * MAD_TO_STD * mad
+
+    # rolling std inside each stint; the first laps of a stint have no full window yet
+    rolling = grouped.rolling(window, min_periods=MIN_STINT_LAPS).std().reset_index(level=keys, drop=True)
+
+    per_lap = laps[keys + ['Compound']].assign(
+        Median=median, MAD=mad, RollingStd=rolling, Outliers=is_outlier)
+
+    stints = per_lap.groupby(keys, sort=False).agg(
+        Compound=('Compound', 'first'),
+        Laps=('Median', 'size'),
+        Median=('Median', 'first'),
+        MAD=('MAD', 'first'),
+        RollingStd=('RollingStd', 'mean'),
+        Outliers=('Outliers', 'sum'),
+    ).reset_index()
+
+    # lap-weighted driver values, only over the stints long enough to count
+    weights = stints['Laps'].where(stints['MAD'].notna(), 0)
+    weighted = stints[['MAD', 'RollingStd']].fillna(0).mul(weights, axis=0)
+    weighted['Weight'] = weights
+    weighted['RollingWeight'] = weights.where(stints['RollingStd'].notna(), 0)
+    weighted['RollingStd'] = weighted['RollingStd'].fillna(0)
+    weighted['Driver'] = stints['Driver']
+    totals = weighted.groupby('Driver', sort=False).sum()
+
+    drivers = pd.DataFrame({
+        'Laps': totals['Weight'].astype(int),
+        'Stints': (weights > 0).groupby(stints['Driver'], sort=False).sum(),
+        'MAD': totals['MAD'] / totals['Weight'].replace(0, np.nan),
+        'RollingStd': totals['RollingStd'] / totals['RollingWeight'].replace(0, np.nan),
+        'Outliers': stints.groupby('Driver', sort=False)['Outliers'].sum(),
+    })
+    drivers = drivers.sort_values('MAD').reset_index()
+
+    return stints, drivers
+
+def get_consistency_table(session, fuel_effect=FUEL_EFFECT_PER_LAP):
+    """
+    Return the driver consistency table shown in the dashboard.
+
+    Drivers with fewer than three representative laps are left out.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 race session.
+    fuel_effect : float, default FUEL_EFFECT_PER_LAP
+        Lap time effect of one lap's worth of fuel in seconds.
+
+    Returns
+    -------
+    table : pandas.DataFrame
+        One row per driver, most consistent first, values rounded to
+        milliseconds.
+    """
+    _, drivers = compute_consistency(get_consistency_laps(session, fuel_effect=fuel_effect))
+    drivers = drivers[drivers['Laps'] > 2]
+
+    return pd.DataFrame({
+        'Driver': drivers['Driver'],
+        'Consistency (MAD) [s]': drivers['MAD'].round(3),
+        f'Rolling Std ({ROLLING_WINDOW} laps) [s]': drivers['RollingStd'].round(3),
+        'Outlier Laps': drivers['Outliers'].astype(int),
+        'Laps': drivers['Laps'],
+        'Stints': drivers['Stints'],
+    })
+
+def summarize_season_consistency(year, events, loader=load_session):
+    """
+    Compute the consistency of every driver over several races of a season.
+
+    The laps of all races are stacked and evaluated in one grouped pass,
+    with the stints of different races kept apart.
+
+    Parameters
+    ----------
+    year : int
+        The season.
+    events : iterable of str
+        Grand Prix names as recognized by FastF1.
+    loader : callable, default fetch_data.load_session
+        Called as `loader(year, event, "R")`.
+
+    Returns
+    -------
+    stints : pandas.DataFrame
+        Per-stint metrics, 'Stint' is prefixed with the event name.
+    drivers : pandas.DataFrame
+        Season metrics per driver.
+    """
+    season_laps = []
+    for event in events:
+        laps = get_consistency_laps(loader(year, event, "R"))
+        # stint 1 of one race is not stint 1 of the next
+        laps['Stint'] = event + ' #' + laps['Stint'].astype(int).astype(str)
+        season_laps.append(laps)
+
+    return compute_consistency(pd.concat(season_laps, ignore_index=True))
@@ -1,7 +1,6 @@
 import sys
 sys.path.append('../scripts')   # allows pysthon to find scripts/ folder
 
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import pandas as pd
 import numpy as np
@@ -10,6 +9,9 @@ import fastf1
 import fastf1.plotting
 from fastf1.core import Laps
 
+from plot_styles import get_team_colors, draw_horizontal_bars, label_bar_ends, chart_style, new_figure
+from lap_index import get_lap_index
+
 # I use this file to calculate the delta time of all drivers compared to the fastest one 
 # for either qualification session or for the race session
 
@@ -18,8 +20,11 @@ fastf1.plotting.setup_mpl(mpl_timedelta_support=True, color_scheme=None)
 
 def get_driver_consistency(session):
     """
-    Calculates the standard deviation of lap times for each driver using NumPy.
+    Calculates the standard deviation of lap times for each driver.
     A lower Standard Deviation (std) means the driver was more consistent.
+
+    This is the plain whole-race spread; see `consistency_analysis` for the
+    fuel-corrected, per-stint metrics used by the dashboard.
     
     Parameters
     ----------
@@ -31,25 +36,20 @@ def get_driver_consistency(session):
     consistency_df : pandas.DataFrame
         Dataframe containing Driver and their lap time Standard Deviation (Consistency).
     """
-    drivers = pd.unique(session.laps['Driver'])
-    consistency_data = []
+    # Gets only accurate racing laps (excluding pit-stop laps and Safety Car), all drivers at once;
+    # quick laps are judged against each driver's own best, as pick_drivers(drv).pick_quicklaps() does
+    index = get_lap_index(session)
+    laps = index.select(index.where(driver_quick=True, accurate=True))
+    lap_times_sec = laps['LapTime'].dt.total_seconds()
 
-    for drv in drivers:
-        # Gets only accurate racing laps (excluding pit-stop laps and Safety Car)
-        driver_laps = session.laps.pick_drivers(drv).pick_quicklaps().pick_accurate()
-        
-        if len(driver_laps) > 2:
-            lap_times_sec = driver_laps['LapTime'].dt.total_seconds()
-            
-            # using numpy to calculate standard deviation
-            consistency_score = np.std(lap_times_sec)
-            
-            consistency_data.append({
-                'Driver': drv,
-                'Consistency (Std Dev) [s]': round(consistency_score, 3)
-            })
-
-    return pd.DataFrame(consistency_data).sort_values(by='Consistency (Std Dev) [s]')
+    grouped = lap_times_sec.groupby(laps['Driver'], sort=False)
+    stats = pd.DataFrame({'Laps': grouped.size(), 'Std': grouped.std(ddof=0)})
+    stats = stats[stats['Laps'] > 2]
+
+    return pd.DataFrame({
+        'Driver': stats.index,
+        'Consistency (Std Dev) [s]': stats['Std'].round(3).to_numpy(),
+    }).sort_values(by='Consistency (Std Dev) [s]')
 
 # this method doesn't care about the fastf1.session as it will be provided when needed as a parameter by the cusotm method on fetch_data
 def get_all_drivers_fastest_lap(session):
@@ -78,8 +78,9 @@ def get_all_drivers_fastest_lap(session):
     list_fastest_laps = list()
 
     # loop to get each drivers fastest lap and append them to the list
+    index = get_lap_index(session)
     for drv in drivers:
-        current_drivers_fastest_lap = session.laps.pick_drivers(drv).pick_fastest()
+        current_drivers_fastest_lap = index.fastest(index.driver(drv))
         if current_drivers_fastest_lap is not None: # to check if the lap time is not 'NaT' which is the equivalend of NaN in pandas time seris
             list_fastest_laps.append(current_drivers_fastest_lap)
     
@@ -139,72 +140,62 @@ def plot_the_final_time_ranking(session):
     fig : matplotlib.figure.Figure
         The generated Matplotlib figure containing the ranking plot.
     """
-    #Just creates a list of team colors for the e plot
-    team_colors = list()
-
     pole_lap, fastest_laps = calculate_drivers_delta_time_compared_to_pole(session=session) # now i get the same fastest_laps list, but from the second method 
 
-    for index, lap in fastest_laps.iterlaps():
-        color = fastf1.plotting.get_team_color(lap['Team'], session=session)
-        team_colors.append(color)
-
-    #as it contains the properly modified one
-
-    fig, ax = plt.subplots(figsize=(10, 5), facecolor='black')
-    ax.set_facecolor('#111111')
-
-    ax.barh(fastest_laps.index, fastest_laps['LapTimeDelta'],
-            color=team_colors, edgecolor='grey')
-    ax.set_yticks(fastest_laps.index)
-    ax.set_yticklabels(fastest_laps['Driver'], color='White')
-
-    ax.set_title(f" {session.event['EventDate'].year} {session.event['EventName']} {session.name} \n Fastest Time: {pole_lap.Driver} -- {str(fastest_laps['LapTime'].iloc[0]).split()[-1]}", #split is used to remove the '0 days part..'
-                color='white', 
-                pad=15)
-    ax.set_xlabel("Lap Time Delta (seconds)", color='white')
-
-    # To add seconds on the side of each drivers time for more readibility
-    for i, delta in enumerate(fastest_laps['LapTimeDelta']):
-        ax.text(delta + pd.Timedelta(seconds=0.02), #offsets the label so they dont overlap
-                i,
-                f"+{delta.total_seconds():.3f}s",
-                va='center',
-                color='white',
-                fontsize=8)
-
-    # iverts to show fastest at the top
-    ax.invert_yaxis()
-
-    # draw vertical lines behind the bars
-    ax.grid(which='major', color='gray', linestyle='-', linewidth=0.5, alpha=0.5)
-    ax.grid(which='minor', color='gray', linestyle='-', linewidth=0.3, alpha=0.3)
-
-    # draw the lines in between major lines
-    ax.minorticks_on()
-
-    # Keep grid behind bars
-    ax.set_axisbelow(True)
-
-    # create one legend entry per team
-    unique_teams = fastest_laps['Team'].unique()
-    legend_patches = []
-
-    for team in unique_teams:
-        color = fastf1.plotting.get_team_color(team,session=session)
-        patch = mpatches.Patch(color=color, label=team)
-        legend_patches.append(patch)
-
-    # add legend to plot
-    legend = ax.legend(handles=legend_patches,
-          loc='upper right',
-          frameon=False,
-          labelcolor='white',
-          title='Teams',
-          fontsize=8,)
-
-    # Simply to set the legend title white and fontsize
-    legend.get_title().set_color('white') 
-    legend.get_title().set_fontsize(10)
+    # team colours come from the per-session style table instead of one lookup per lap
+    team_colors = get_team_colors(session)
+    bar_colors = fastest_laps['Team'].map(team_colors).fillna('grey')
+
+    # deltas in seconds, all bars are drawn as a single collection
+    deltas = fastest_laps['LapTimeDelta'].dt.total_seconds().to_numpy()
+    y = np.arange(len(fastest_laps))
+
+    with chart_style():
+        fig, ax = new_figure(figsize=(10, 5), facecolor='black')
+        ax.set_facecolor('#111111')
+
+        draw_horizontal_bars(ax, y, deltas, bar_colors, edgecolor='grey')
+        ax.set_xlim(0, max(deltas.max(), 0.1) * 1.15)  # room for the label of the slowest driver
+        ax.set_ylim(-0.6, len(y) - 0.4)
+        ax.set_yticks(y)
+        ax.set_yticklabels(fastest_laps['Driver'], color='White')
+
+        ax.set_title(f" {session.event['EventDate'].year} {session.event['EventName']} {session.name} \n Fastest Time: {pole_lap.Driver} -- {str(fastest_laps['LapTime'].iloc[0]).split()[-1]}", #split is used to remove the '0 days part..'
+                    color='white', 
+                    pad=15)
+        ax.set_xlabel("Lap Time Delta (seconds)", color='white')
+
+        # To add seconds next to each bar for more readibility
+        label_bar_ends(ax, y, deltas, [f"+{delta:.3f}s" for delta in deltas], color='white', fontsize=8)
+
+        # iverts to show fastest at the top
+        ax.invert_yaxis()
+
+        # draw vertical lines behind the bars
+        ax.grid(which='major', color='gray', linestyle='-', linewidth=0.5, alpha=0.5)
+        ax.grid(which='minor', color='gray', linestyle='-', linewidth=0.3, alpha=0.3)
+
+        # draw the lines in between major lines
+        ax.minorticks_on()
+
+        # Keep grid behind bars
+        ax.set_axisbelow(True)
+
+        # create one legend entry per team
+        legend_patches = [mpatches.Patch(color=team_colors.get(team, 'grey'), label=team)
+                          for team in fastest_laps['Team'].unique()]
+
+        # add legend to plot
+        legend = ax.legend(handles=legend_patches,
+              loc='upper right',
+              frameon=False,
+              labelcolor='white',
+              title='Teams',
+              fontsize=8,)
+
+        # Simply to set the legend title white and fontsize
+        legend.get_title().set_color('white') 
+        legend.get_title().set_fontsize(10)
 
     full_name = session.results.loc[
     session.results['Abbreviation'] == pole_lap['Driver'], 'FullName'
@@ -1,40 +1,33 @@
 import fastf1
-from pathlib import Path 
+from fastf1.core import DataNotLoadedError
+
+import cache_manager
 
 def setup_fastf1_cache():
     """
     Configure and enable the FastF1 cache for the project.
 
-    This function automatically determines the root directory of the
-    project based on the location of the current script, then enables
-    the FastF1 cache inside `external_data/fastf1`. FastF1 will use
-    this directory to store downloaded session data locally, improving
-    performance and allowing offline re-use.
+    The cache lives in `external_data/fastf1` under the project root and
+    is managed by `cache_manager`, so the dashboard, the scripts and the
+    warm-up command all share one directory. FastF1 is only configured
+    on the first call.
 
     Returns
     -------
-    None
+    cache_dir : pathlib.Path
+        The resolved cache directory.
     """
-   # Gets path to this file
-    script_path = Path(__file__).resolve()
-    
-    # gets the project root (parent of scripts)
-    project_root = script_path.parent.parent
-    
-    # define cache path from the root
-    cache_dir = project_root / "external_data" / "fastf1"
-    
-    # enable the cache to store the data locally
-    fastf1.Cache.enable_cache(cache_dir)
+    return cache_manager.enable_cache()
 
-def load_session(year: int, gp: str, session_type: str): 
+def load_session(year: int, gp: str, session_type: str, **load_kwargs): 
     """
     Load a Formula 1 session using FastF1.
 
     This function enables the cache (if not already enabled), retrieves
     the requested session (race, qualifying, practice, etc.), loads all
     available data, and returns the fully initialized FastF1 session
-    object.
+    object. Afterwards the least recently used events are evicted if
+    the cache grew above its size cap.
 
     Parameters
     ----------
@@ -48,6 +41,9 @@ def load_session(year: int, gp: str, session_type: str):
         - "R" for Race
         - "Q" for Qualifying
         - "FP1", "FP2", "FP3" for free practice
+    **load_kwargs
+        Passed on to `Session.load`, e.g. `weather=False, messages=False`
+        to skip data that is not needed.
 
     Returns
     -------
@@ -57,9 +53,42 @@ def load_session(year: int, gp: str, session_type: str):
     """
     setup_fastf1_cache()
     session = fastf1.get_session(year, gp, session_type)
-    session.load()
+    session.load(**load_kwargs)
+
+    # keep the cache within its size budget, never evicting the event we just loaded
+    cache_manager.mark_event_used(session)
+    cache_manager.enforce_size_cap(keep=cache_manager.get_event_cache_dir(session))
     return session
 
+def check_session_data(session, telemetry=True):
+    """
+    Make sure a loaded session actually contains data.
+
+    `Session.load` does not raise when the timing data cannot be loaded
+    (e.g. not published yet, or the download failed), it only logs a
+    warning and leaves the data missing. Code that loads sessions ahead
+    of time calls this to tell a cached session from a failed one.
 
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A session after `Session.load`.
+    telemetry : bool, default True
+        Also require car telemetry.
 
-    
+    Returns
+    -------
+    session : fastf1.core.Session
+        The same session.
+
+    Raises
+    ------
+    fastf1.core.DataNotLoadedError
+        If the laps (or the telemetry) are missing or empty.
+    """
+    # the properties raise DataNotLoadedError themselves if loading failed completely
+    if session.laps.empty:
+        raise DataNotLoadedError(f"no lap data for {session}")
+    if telemetry and not session.car_data:
+        raise DataNotLoadedError(f"no telemetry for {session}")
+    return session
@@ -1,11 +1,50 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import numpy as np
 import pandas as pd
 import fastf1
 import fastf1.plotting
 
+from plot_styles import get_team_colors, draw_horizontal_bars, chart_style, new_figure
+
 fastf1.plotting.setup_mpl(mpl_timedelta_support=True, color_scheme=None)
 
+def get_final_classification(session):
+    """
+    Return the final classification of a session sorted by position.
+
+    Classified drivers come first in finishing order, followed by the
+    non-classified ones (DNF, DSQ, NC...).
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        The loaded FastF1 session containing classification results.
+
+    Returns
+    -------
+    results : pandas.DataFrame
+        A copy of `session.results` sorted by position, with the extra
+        columns 'PosNum' (numeric position, NaN if not classified) and
+        'PositionLabel' (e.g. "P1" or "DNF"), and 'TeamName' filled with
+        'Unknown' where missing.
+    """
+    results = session.results.copy()
+
+    # turns numeric position for sorting, and looks for not valid data like DNF(did not finish) and converts them to NaN
+    results['PosNum'] = pd.to_numeric(results['Position'], errors='coerce')
+
+    # sorts by classified position; put NaNs at the end
+    results = results.sort_values(['PosNum', 'Abbreviation'], na_position='last').reset_index(drop=True)
+
+    results['TeamName'] = results['TeamName'].fillna('Unknown')
+
+    # positions for display: show P# for classified, otherwise the raw label (e.g., DNF/DSQ/NC)
+    raw_position = results['Position'].astype('string').fillna('DNF').replace('', 'DNF')
+    classified = 'P' + results['PosNum'].astype('Int64').astype('string')
+    results['PositionLabel'] = classified.fillna(raw_position).astype(str)
+
+    return results
+
 def plot_the_final_ranking(session):
     """
     Plot the final race classification for a given FastF1 session.
@@ -31,65 +70,58 @@ def plot_the_final_ranking(session):
         Streamlit.
     """
 
-    plt.rcdefaults() #Used to reset the grid to default, beacause some styles may  have been set globally by fastf1.plottting
-    
-    results = session.results.copy()
-
-    # turns numeric position for sorting, and looks for not valid data like DNF(did not finish) and converts them to NaN
-    results['PosNum'] = pd.to_numeric(results['Position'], errors='coerce')
-
-    # sorts by classified position; put NaNs at the end
-    results = results.sort_values(['PosNum', 'Abbreviation'], na_position='last').reset_index(drop=True)
+    results = get_final_classification(session)
 
     drivers = results['Abbreviation']
-    teams = results['TeamName'].fillna('Unknown')
-
-    # positions for display: show P# for classified, otherwise the raw label (e.g., DNF/DSQ/NC)
-    pos_display = results.apply(
-        lambda r: f"P{int(r['PosNum'])}" if pd.notna(r['PosNum']) else (str(r['Position']) or "DNF"),
-        axis=1
-    )
-
-    colors = [fastf1.plotting.get_team_color(team, session=session) for team in teams]
-
-    fig, ax = plt.subplots(figsize=(8, 5))
-
-    # draw equal-length bars, one per driver, in sorted order
-    y = range(len(drivers))
-    ax.barh(y, [1]*len(drivers), color=colors)
-
-    # label the y-axis with driver abbreviations
-    ax.set_yticks(y)
-    ax.set_yticklabels(drivers)
-
-    # invert so P1 is at the top
-    ax.invert_yaxis()
-
-    # clean axes
-    ax.set_xticks([])
-    ax.set_xlabel('')
-    ax.set_ylabel('')
-    ax.set_xlim(0, 1.5)
-    ax.set_title(f"{session.event['EventName']} {session.event['EventDate'].year} {session.name} Results:", 
-                 fontsize=13, fontweight='bold')
-
-    # position labels at the right side
-    for i, lbl in enumerate(pos_display):
-        ax.text(1.05, i, lbl, va='center', fontsize=10)
-
-    # legend (one entry per team)
-    legend_patches = []
-    for team in teams.unique():
-        color = fastf1.plotting.get_team_color(team, session=session)
-        legend_patches.append(mpatches.Patch(color=color, label=team))
-
-    ax.legend(handles=legend_patches,
-              loc='upper right',
-              frameon=False,
-              title='Teams',
-              title_fontsize=10,
-              fontsize=8)
-
-    ax.set_frame_on(False)
-    plt.tight_layout()
+    teams = results['TeamName']
+    pos_display = results['PositionLabel']
+
+    # team colours come from the per-session style table, one lookup per team
+    team_colors = get_team_colors(session)
+    colors = teams.map(team_colors).fillna('grey')
+
+    with chart_style():
+        fig, ax = new_figure(figsize=(8, 5))
+
+        # draw equal-length bars, one per driver, in sorted order, as a single collection
+        y = np.arange(len(drivers))
+        draw_horizontal_bars(ax, y, np.ones(len(drivers)), colors)
+        ax.set_ylim(-0.6, len(y) - 0.4)
+
+        # label the y-axis with driver abbreviations
+        ax.set_yticks(y)
+        ax.set_yticklabels(drivers)
+
+        # invert so P1 is at the top
+        ax.invert_yaxis()
+
+        # clean axes
+        ax.set_xticks([])
+        ax.set_xlabel('')
+        ax.set_ylabel('')
+        ax.set_xlim(0, 1.5)
+        ax.set_title(f"{session.event['EventName']} {session.event['EventDate'].year} {session.name} Results:", 
+                     fontsize=13, fontweight='bold')
+
+        # position labels next to the bar ends (x=1.05), drawn as one batch of tick labels
+        # on a secondary axis placed there (its location is a fraction of the axes width)
+        position_axis = ax.secondary_yaxis(1.05 / 1.5)
+        position_axis.set_yticks(y)
+        position_axis.set_yticklabels(pos_display, fontsize=10)
+        position_axis.tick_params(length=0)
+        position_axis.spines['right'].set_visible(False)
+
+        # legend (one entry per team)
+        legend_patches = [mpatches.Patch(color=team_colors.get(team, 'grey'), label=team)
+                          for team in teams.unique()]
+
+        ax.legend(handles=legend_patches,
+                  loc='upper right',
+                  frameon=False,
+                  title='Teams',
+                  title_fontsize=10,
+                  fontsize=8)
+
+        ax.set_frame_on(False)
+        fig.tight_layout()
     return fig
@@ -0,0 +1,340 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+from fastf1.core import Laps
+
+# Lap filters as bitmaps. Chained FastF1 pickers (pick_drivers().pick_quicklaps()...) scan
+# and copy the whole laps DataFrame at every step. Here every lap flag and every driver,
+# compound and stint value is turned into a packed bitmap (one bit per lap) once per
+# session. A filter is then a few bitwise operations on arrays of ~150 bytes, and only
+# the final selection touches the lap data.
+
+# track status codes of the timing data, a lap's TrackStatus lists every status seen during it
+TRACK_STATUS_CODES = {
+    'yellow': '2',
+    'safety_car': '4',
+    'red': '5',
+    'vsc': '6',
+    'vsc_ending': '7',
+}
+
+# number of set bits of every byte value, to count laps without unpacking
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+_index_cache = weakref.WeakKeyDictionary()
+_index_lock = threading.Lock()
+
+class LapMask:
+    """
+    A set of laps of one session, stored as a packed bitmap.
+
+    Masks are combined with `&`, `|`, `^` and `~` and are turned into lap
+    positions (or lap data) by the `LapIndex` they come from.
+
+    Parameters
+    ----------
+    bits : numpy.ndarray
+        Packed bits (uint8, most significant bit first), see `numpy.packbits`.
+    n : int
+        Number of laps.
+    """
+
+    __slots__ = ('bits', 'n')
+
+    def __init__(self, bits, n):
+        self.bits = bits
+        self.n = n
+
+    @classmethod
+    def from_bool(cls, values):
+        values = np.asarray(values, dtype=bool)
+        return cls(np.packbits(values), len(values))
+
+    def _check(self, other):
+        if not isinstance(other, LapMask):
+            return NotImplemented
+        if other.n != self.n:
+            raise ValueError("masks belong to different lap tables")
+        return other
+
+    def __and__(self, other):
+        other = self._check(other)
+        return other if other is NotImplemented else LapMask(self.bits & other.bits, self.n)
+
+    def __or__(self, other):
+        other = self._check(other)
+        return other if other is NotImplemented else LapMask(self.bits | other.bits, self.n)
+
+    def __xor__(self, other):
+        other = self._check(other)
+        return other if other is NotImplemented else LapMask(self.bits ^ other.bits, self.n)
+
+    def __invert__(self):
+        bits = ~self.bits
+        # keep the padding bits of the last byte cleared
+        if self.n % 8:
+            bits[-1] &= (0xFF << (8 - self.n % 8)) & 0xFF
+        return LapMask(bits, self.n)
+
+    def count(self):
+        """Number of laps in the mask."""
+        return int(_POPCOUNT[self.bits].sum())
+
+    def any(self):
+        return bool(self.bits.any())
+
+    def to_bool(self):
+        """The mask as boolean array with one value per lap."""
+        return np.unpackbits(self.bits, count=self.n).view(bool)
+
+    def positions(self):
+        """Integer positions (for `.iloc`) of the laps in the mask."""
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.n))
+
+    def __repr__(self):
+        return f"LapMask({self.count()} of {self.n} laps)"
+
+class LapIndex:
+    """
+    Bitmap index over the laps of a session.
+
+    Flags (True/False per lap):
+        - 'valid_time' : the lap has a lap time
+        - 'accurate' : passed FastF1's accuracy check (IsAccurate)
+        - 'quick' : faster than 107% of the fastest lap of the session,
+          like `Laps.pick_quicklaps()` on the whole session
+        - 'driver_quick' : faster than 107% of the driver's own fastest
+          lap, like `pick_drivers(drv).pick_quicklaps()`
+        - 'pit_in', 'pit_out' : in-lap / out-lap
+        - 'deleted' : lap time deleted by race control
+        - 'personal_best' : the driver's personal best at that time
+        - 'yellow', 'safety_car', 'red', 'vsc', 'vsc_ending' : the track
+          status was set at some point of the lap
+        - 'green' : none of the statuses above during the lap
+
+    Values: one bitmap per driver, compound and stint.
+
+    Laps are not reordered, positions refer to `laps`. FastF1 stores
+    the laps grouped by driver in lap order, so the laps of a driver (or
+    of one stint) are contiguous and are returned as views.
+
+    Parameters
+    ----------
+    laps : fastf1.core.Laps
+        The laps of a session.
+    """
+
+    def __init__(self, laps):
+        self.laps = laps
+        self.n = len(laps)
+        self._columns = {}
+
+        lap_time = laps['LapTime']
+        valid_time = lap_time.notna().to_numpy()
+        quick = (lap_time < lap_time.min() * Laps.QUICKLAP_THRESHOLD).to_numpy()
+        driver_best = lap_time.groupby(laps['Driver'], sort=False).transform('min')
+        driver_quick = (lap_time < driver_best * Laps.QUICKLAP_THRESHOLD).to_numpy()
+
+        track_status = laps['TrackStatus'].fillna('').astype(str)
+        flags = {
+            'valid_time': valid_time,
+            # eq(True): the boolean columns may contain NaN/None
+            'accurate': laps['IsAccurate'].eq(True).to_numpy(),
+            'quick': quick,
+            'driver_quick': driver_quick,
+            'pit_in': laps['PitInTime'].notna().to_numpy(),
+            'pit_out': laps['PitOutTime'].notna().to_numpy(),
+            'deleted': laps['Deleted'].eq(True).to_numpy() if 'Deleted' in laps.columns
+                       else np.zeros(self.n, dtype=bool),
+            'personal_best': laps['IsPersonalBest'].eq(True).to_numpy(),
+        }
+        for name, code in TRACK_STATUS_CODES.items():
+            flags[name] = track_status.str.contains(code, regex=False).to_numpy()
+        flags['green'] = ~np.logical_or.reduce([flags[name] for name in TRACK_STATUS_CODES])
+
+        # all flags packed in one go, one row per flag
+        names = list(flags)
+        packed = np.packbits(np.stack([flags[name] for name in names]), axis=1)
+        self._flags = dict(zip(names, packed))
+
+        self._values = {
+            'driver': self._value_bitmaps(laps['Driver']),
+            'compound': self._value_bitmaps(laps['Compound']),
+            'stint': self._value_bitmaps(laps['Stint']),
+        }
+
+    def _value_bitmaps(self, column):
+        # one-hot encoding of the column, packed: one bitmap per distinct value
+        codes, uniques = pd.factorize(column)
+        if len(uniques) == 0:
+            return {}
+        one_hot = codes[np.newaxis, :] == np.arange(len(uniques))[:, np.newaxis]
+        packed = np.packbits(one_hot, axis=1)
+        if column.name == 'Stint':
+            uniques = uniques.astype(int)
+        return dict(zip(uniques.tolist(), packed))
+
+    @property
+    def flags(self):
+        """Names of the available flags."""
+        return list(self._flags)
+
+    def all(self):
+        """Mask of all laps."""
+        return ~self.none()
+
+    def none(self):
+        """Empty mask."""
+        return LapMask(np.zeros((self.n + 7) // 8, dtype=np.uint8), self.n)
+
+    def flag(self, name):
+        """
+        Return the mask of a flag, e.g. `index.flag('accurate')`.
+
+        Raises
+        ------
+        KeyError
+            If there is no flag of that name.
+        """
+        return LapMask(self._flags[name], self.n)
+
+    def _value(self, kind, values):
+        bitmaps = self._values[kind]
+        mask = self.none()
+        for value in values:
+            if value in bitmaps:
+                mask = mask | LapMask(bitmaps[value], self.n)
+        return mask
+
+    def driver(self, *drivers):
+        """Mask of the laps of any of the given drivers."""
+        return self._value('driver', drivers)
+
+    def compound(self, *compounds):
+        """Mask of the laps on any of the given tyre compounds."""
+        return self._value('compound', compounds)
+
+    def stint(self, *stints):
+        """Mask of the laps of any of the given stint numbers."""
+        return self._value('stint', [int(s) for s in stints])
+
+    def where(self, driver=None, compound=None, stint=None, **flags):
+        """
+        Combine value and flag conditions with a logical AND.
+
+        Parameters
+        ----------
+        driver, compound, stint : str/int or list, optional
+            Keep laps with any of these values.
+        **flags : bool
+            `name=True` keeps laps with the flag, `name=False` laps
+            without it.
+
+        Returns
+        -------
+        mask : LapMask
+
+        Examples
+        --------
+        >>> index.where(driver='VER', compound='HARD', accurate=True, pit_in=False)
+        """
+        mask = self.all()
+        for kind, values in (('driver', driver), ('compound', compound), ('stint', stint)):
+            if values is not None:
+                if np.isscalar(values):  # also numpy scalars, e.g. a value taken from the laps
+                    values = [values]
+                mask = mask & getattr(self, kind)(*values)
+        for name, wanted in flags.items():
+            mask = mask & (self.flag(name) if wanted else ~self.flag(name))
+        return mask
+
+    def _selection(self, mask):
+        # contiguous selections become a slice, so column data is returned as a view
+        positions = mask.positions()
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            return slice(positions[0], positions[-1] + 1)
+        return positions
+
+    def column(self, name, mask=None):
+        """
+        Return the values of a lap column as numpy array.
+
+        The column is converted once per index. Selections of contiguous
+        laps (e.g. one driver, one stint) are views without a copy, other
+        selections only copy the selected values.
+
+        Parameters
+        ----------
+        name : str
+            Column of the laps, e.g. 'LapTime' or 'LapNumber'.
+        mask : LapMask, optional
+            Laps to return, by default all.
+        """
+        if name not in self._columns:
+            self._columns[name] = self.laps[name].to_numpy()
+        values = self._columns[name]
+        return values if mask is None else values[self._selection(mask)]
+
+    def select(self, mask):
+        """
+        Return the laps of a mask as `Laps`, for code that needs a lap table.
+
+        Contiguous selections are a positional slice of the session laps.
+        """
+        return self.laps.iloc[self._selection(mask)]
+
+    def fastest(self, mask=None, only_by_time=False):
+        """
+        Return the fastest lap of a mask, like `Laps.pick_fastest()`.
+
+        Parameters
+        ----------
+        mask : LapMask, optional
+            Laps to consider, by default all.
+        only_by_time : bool, default False
+            Ignore whether laps are marked as personal best.
+
+        Returns
+        -------
+        lap : fastf1.core.Lap or None
+            None if the mask has no (personal best) lap with a lap time.
+        """
+        mask = self.all() if mask is None else mask
+        mask = mask & self.flag('valid_time')
+        if not only_by_time:
+            mask = mask & self.flag('personal_best')
+
+        positions = mask.positions()
+        if len(positions) == 0:
+            return None
+        # argmin returns the first of equal times, i.e. the first lap clocked
+        best = positions[np.argmin(self.column('LapTime')[positions])]
+        return self.laps.iloc[best]
+
+def get_lap_index(session):
+    """
+    Return the bitmap index of a session's laps, built once per session.
+
+    The index is cached until the session is released, and rebuilt if
+    `session.laps` was replaced (e.g. the session was loaded again).
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session.
+
+    Returns
+    -------
+    index : LapIndex
+    """
+    with _index_lock:
+        index = _index_cache.get(session)
+    if index is not None and index.laps is session.laps:
+        return index
+
+    index = LapIndex(session.laps)
+    with _index_lock:
+        _index_cache[session] = index
+    return index
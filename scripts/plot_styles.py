@@ -0,0 +1,283 @@
+import threading
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.container import BarContainer
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
+
+import fastf1.plotting
+
+# Looking up team/driver colours through fastf1.plotting is slow compared to drawing,
+# and the chart modules used to do it once per lap or per bar. The styles of a session
+# are computed once here and reused by every chart drawn for that session.
+
+_styles_cache = weakref.WeakKeyDictionary()
+_styles_lock = threading.Lock()
+
+# rcParams are process-global, so figures are only *built* while holding this lock.
+# Rendering the finished figure (savefig / st.pyplot) does not need it and runs in parallel.
+_rc_lock = threading.RLock()
+_building = threading.local()
+
+
+def get_session_styles(session):
+    """
+    Return the plotting styles of every driver in a session.
+
+    The table is built once per session (FastF1 colour lookups are done
+    once per team and once per driver) and then served from a cache
+    that is released together with the session.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session with results and lap data.
+
+    Returns
+    -------
+    styles : pandas.DataFrame
+        A DataFrame indexed by driver abbreviation with the columns:
+            - 'Team' : str, team name
+            - 'TeamColor' : str, hex colour of the team
+            - 'DriverColor' : str, hex colour of the driver
+            - 'LineStyle' : str, line style separating team mates
+    """
+    with _styles_lock:
+        styles = _styles_cache.get(session)
+    if styles is not None:
+        return styles
+
+    # driver/team pairs from the results, completed with the laps for drivers missing there
+    drivers = session.results[['Abbreviation', 'TeamName']].rename(
+        columns={'Abbreviation': 'Driver', 'TeamName': 'Team'})
+    lap_drivers = session.laps[['Driver', 'Team']].drop_duplicates('Driver')
+    drivers = (pd.concat([drivers, lap_drivers])
+                 .dropna(subset=['Driver'])
+                 .drop_duplicates('Driver')
+                 .set_index('Driver'))
+    drivers['Team'] = drivers['Team'].fillna('Unknown')
+
+    team_colors = {team: _lookup(fastf1.plotting.get_team_color, team, session, default='grey')
+                   for team in drivers['Team'].unique()}
+    drivers['TeamColor'] = drivers['Team'].map(team_colors)
+
+    driver_colors, line_styles = [], []
+    for drv, team_color in zip(drivers.index, drivers['TeamColor']):
+        style = _lookup(fastf1.plotting.get_driver_style, drv, session,
+                        style=['color', 'linestyle'], default={})
+        driver_colors.append(style.get('color', team_color))
+        line_styles.append(style.get('linestyle', 'solid'))
+    drivers['DriverColor'] = driver_colors
+    drivers['LineStyle'] = line_styles
+
+    with _styles_lock:
+        _styles_cache[session] = drivers
+    return drivers
+
+
+def get_team_colors(session):
+    """
+    Return a mapping from team name to team colour for a session.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session.
+
+    Returns
+    -------
+    team_colors : dict
+        Team name -> hex colour, in order of first appearance.
+    """
+    styles = get_session_styles(session)
+    return dict(zip(styles['Team'], styles['TeamColor']))
+
+
+def _lookup(func, identifier, session, default, **kwargs):
+    # unknown drivers/teams (e.g. reserve drivers) should not break a whole chart
+    try:
+        return func(identifier, session=session, **kwargs)
+    except (KeyError, ValueError):
+        return default
+
+
+def draw_horizontal_bars(ax, y, widths, colors, height=0.8, left=0, **kwargs):
+    """
+    Draw a horizontal bar chart as one `PatchCollection`.
+
+    This is the batched equivalent of `ax.barh`: all bars are a single
+    artist, so drawing cost does not grow with one artist per bar.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The axes to draw on.
+    y : array-like of float
+        Bar centres on the y-axis.
+    widths : array-like of float
+        Bar lengths on the x-axis.
+    colors : array-like
+        One face colour per bar.
+    height : float, default 0.8
+        Bar thickness.
+    left : float, default 0
+        Start of the bars on the x-axis.
+    **kwargs
+        Passed on to `PatchCollection` (e.g. edgecolor).
+
+    Returns
+    -------
+    bars : matplotlib.collections.PatchCollection
+        The added collection.
+    """
+    bars = PatchCollection(_bar_rectangles(y, widths, height, left), facecolors=list(colors), **kwargs)
+    ax.add_collection(bars, autolim=True)
+    ax.autoscale_view()
+    return bars
+
+
+def label_bar_ends(ax, y, widths, labels, height=0.8, left=0, padding=3, **kwargs):
+    """
+    Write a label just past the end of every bar of `draw_horizontal_bars`.
+
+    The bars of the collection are described again as a `BarContainer`,
+    so `ax.bar_label` can place the labels; only the labels are added to
+    the axes.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The axes the bars were drawn on.
+    y, widths, height, left
+        The same values as passed to `draw_horizontal_bars`.
+    labels : list of str
+        One label per bar.
+    padding : float, default 3
+        Distance between bar end and label in points.
+    **kwargs
+        Passed on to `ax.bar_label` (e.g. color, fontsize).
+
+    Returns
+    -------
+    annotations : list of matplotlib.text.Annotation
+    """
+    rects = _bar_rectangles(y, widths, height, left)
+    container = BarContainer(rects, datavalues=np.asarray(widths, dtype=float), orientation='horizontal')
+    return ax.bar_label(container, labels=list(labels), padding=padding, **kwargs)
+
+
+def _bar_rectangles(y, widths, height, left):
+    y = np.asarray(y, dtype=float)
+    widths = np.asarray(widths, dtype=float)
+    return [Rectangle((left, yi - height / 2), w, height) for yi, w in zip(y, widths)]
+
+
+def draw_driver_lines(ax, matrix, session, **kwargs):
+    """
+    Draw one line per driver as one `LineCollection`, with a legend.
+
+    Drivers are ordered by the session classification (drivers missing
+    from the results go last) and drawn in their colour and line style.
+    The legend uses proxy handles that are not drawn on the axes.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        The axes to draw on.
+    matrix : pandas.DataFrame
+        Lap numbers as index, one column per driver abbreviation.
+    session : fastf1.core.Session
+        The session the data belongs to.
+    **kwargs
+        Passed on to `LineCollection` (e.g. linewidths).
+
+    Returns
+    -------
+    lines : matplotlib.collections.LineCollection
+        The added collection.
+    """
+    order = [drv for drv in session.results['Abbreviation'] if drv in matrix.columns]
+    matrix = matrix[order + [drv for drv in matrix.columns if drv not in order]]
+    styles = get_session_styles(session).reindex(matrix.columns)
+    colors = styles['DriverColor'].fillna('grey').tolist()
+    linestyles = styles['LineStyle'].fillna('solid').tolist()
+
+    laps = matrix.index.to_numpy(dtype=float)
+    values = matrix.to_numpy(dtype=float)
+    segments = [np.column_stack([laps, values[:, i]]) for i in range(values.shape[1])]
+
+    lines = LineCollection(segments, colors=colors, linestyles=linestyles, **kwargs)
+    ax.add_collection(lines)
+    ax.set_xlim(laps.min() - 1, laps.max() + 1)
+
+    legend_handles = [Line2D([], [], color=color, linestyle=linestyle, label=drv)
+                      for drv, color, linestyle in zip(matrix.columns, colors, linestyles)]
+    ax.legend(handles=legend_handles, bbox_to_anchor=(1.0, 1.02))
+    return lines
+
+
+@contextmanager
+def chart_style(*styles):
+    """
+    Build a figure with a scoped matplotlib style.
+
+    The style always starts from the matplotlib defaults, so charts look
+    the same no matter what other code changed globally, and every
+    change is undone when the block exits. Figures must be created with
+    `new_figure` (not pyplot) inside the block. Because rcParams are
+    shared by the whole process, building figures is serialized by a
+    lock. Before the block exits the figures get one draw pass without
+    output, so the finished figures no longer depend on rcParams and
+    can be rendered (savefig / st.pyplot) from any thread in parallel.
+
+    Parameters
+    ----------
+    *styles : str or dict
+        Extra styles applied on top of the defaults, e.g. a style name
+        or a dictionary of rcParams.
+    """
+    with _rc_lock, matplotlib.style.context(['default', *styles]):
+        _building.figures = []
+        try:
+            yield
+            # matplotlib creates some artists (e.g. extra ticks) lazily on the first draw, reading
+            # rcParams at that moment. Do that pass here, while the scoped style is still active.
+            for fig in _building.figures:
+                fig.draw_without_rendering()
+        finally:
+            _building.figures = None
+
+
+def new_figure(nrows=1, ncols=1, **kwargs):
+    """
+    Create a figure and its axes without going through pyplot.
+
+    The figure is not registered in pyplot's global figure manager, so
+    it is never the implicit "current figure" of another thread and it
+    is freed as soon as it is no longer referenced.
+
+    Parameters
+    ----------
+    nrows, ncols : int, default 1
+        Grid of subplots, as in `plt.subplots`.
+    **kwargs
+        Passed on to `matplotlib.figure.Figure` (e.g. figsize, facecolor).
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+        The new figure.
+    ax : matplotlib.axes.Axes or array of Axes
+        The created axes.
+    """
+    fig = Figure(**kwargs)
+    ax = fig.subplots(nrows, ncols)
+    if getattr(_building, 'figures', None) is not None:
+        _building.figures.append(fig)
+    return fig, ax
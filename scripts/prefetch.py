@@ -0,0 +1,222 @@
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import fastf1
+
+from fetch_data import load_session, check_session_data
+
+# Background prefetcher: loads the sessions of the latest and the upcoming weekends into
+# the shared FastF1 cache, so the first analyst opening a new race does not pay the cold
+# download and parse. The schedule source, the loader and the clock can be replaced, so
+# the prefetcher can run against a local stand-in of the data API.
+
+# lower number = loaded first; race and qualifying are what the dashboard needs
+SESSION_PRIORITY = {
+    'Race': 0,
+    'Qualifying': 1,
+    'Sprint': 2,
+    'Sprint Qualifying': 3,
+    'Sprint Shootout': 3,
+    'Practice 3': 4,
+    'Practice 2': 5,
+    'Practice 1': 6,
+}
+
+def utc_now():
+    # naive UTC timestamp, comparable with the SessionXDateUtc columns of the schedule
+    return pd.Timestamp.now(tz='UTC').tz_localize(None)
+
+def build_prefetch_plan(schedule, now, lookback_days=10, lookahead_days=7, available_after_hours=3):
+    """
+    List the sessions that should be in the cache right now.
+
+    A session is included if its event is within the look-back /
+    look-ahead window and the session ended long enough ago for its
+    data to be published. Sessions of a weekend that is still running
+    are therefore picked up one by one as they finish.
+
+    Parameters
+    ----------
+    schedule : pandas.DataFrame
+        Event schedule with the columns of `fastf1.get_event_schedule`
+        ('EventName', 'EventDate', 'Session1'...'Session5' and
+        'Session1DateUtc'...'Session5DateUtc').
+    now : pandas.Timestamp
+        Current time as naive UTC timestamp.
+    lookback_days : int, default 10
+        How far back an event may be to count as "recent".
+    lookahead_days : int, default 7
+        How far ahead an event may be to count as "upcoming".
+    available_after_hours : float, default 3
+        Time after the session start after which its data is expected
+        to be available.
+
+    Returns
+    -------
+    plan : pandas.DataFrame
+        One row per session with the columns ['Year', 'EventName',
+        'Session', 'SessionDate', 'Priority'], ordered by priority (race
+        and qualifying before practice) and then most recent first.
+    """
+    columns = ['Year', 'EventName', 'Session', 'SessionDate', 'Priority']
+
+    event_dates = pd.to_datetime(schedule['EventDate'])
+    in_window = (event_dates >= now - pd.Timedelta(days=lookback_days)) & \
+                (event_dates <= now + pd.Timedelta(days=lookahead_days))
+    events = schedule[in_window]
+    if events.empty:
+        return pd.DataFrame(columns=columns)
+
+    # one row per (event, session) instead of the five SessionN column pairs
+    sessions = pd.concat([
+        pd.DataFrame({
+            'EventName': events['EventName'],
+            'EventDate': event_dates[in_window],
+            'Session': events[f'Session{i}'],
+            'SessionDate': pd.to_datetime(events[f'Session{i}DateUtc']),
+        })
+        for i in range(1, 6) if f'Session{i}' in events.columns
+    ], ignore_index=True)
+
+    available = sessions['SessionDate'] + pd.Timedelta(hours=available_after_hours) <= now
+    sessions = sessions[available & sessions['Session'].isin(SESSION_PRIORITY.keys())].copy()
+
+    sessions['Year'] = sessions['EventDate'].dt.year
+    sessions['Priority'] = sessions['Session'].map(SESSION_PRIORITY)
+    sessions = sessions.sort_values(['Priority', 'SessionDate'], ascending=[True, False])
+    return sessions[columns].reset_index(drop=True)
+
+class Prefetcher:
+    """
+    Background daemon that keeps the recent and upcoming sessions cached.
+
+    Every `interval` seconds the schedule is read, the prefetch plan is
+    built and the sessions that were not loaded yet are handed to a
+    bounded pool of worker threads in priority order. Sessions that fail
+    (e.g. data not published yet) are retried on the next round.
+
+    Parameters
+    ----------
+    workers : int, default 2
+        Maximum number of sessions loaded at the same time.
+    interval : float, default 900
+        Seconds between two rounds.
+    get_schedule : callable, default fastf1.get_event_schedule
+        Called as `get_schedule(year)`, returns the event schedule.
+    loader : callable, default fetch_data.load_session
+        Called as `loader(year, event_name, session)`, loads a session
+        into the cache and returns it. A session without laps or
+        telemetry counts as failed.
+    clock : callable, default utc_now
+        Returns the current time as naive UTC timestamp.
+    **plan_kwargs
+        Passed on to `build_prefetch_plan` (lookback_days, ...).
+    """
+
+    def __init__(self, workers=2, interval=900, get_schedule=None, loader=load_session,
+                 clock=utc_now, **plan_kwargs):
+        self.workers = workers
+        self.interval = interval
+        self.get_schedule = get_schedule or (lambda year: fastf1.get_event_schedule(year, include_testing=False))
+        self.loader = loader
+        self.clock = clock
+        self.plan_kwargs = plan_kwargs
+
+        self.loaded = set()
+        self.failed = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current_plan(self):
+        # the window may cross new year, so read both seasons then
+        now = self.clock()
+        lookback = pd.Timedelta(days=self.plan_kwargs.get('lookback_days', 10))
+        years = sorted({(now - lookback).year, now.year})
+        schedule = pd.concat([self.get_schedule(year) for year in years], ignore_index=True)
+        return build_prefetch_plan(schedule, now, **self.plan_kwargs)
+
+    def _load(self, key):
+        year, event_name, session_name = key
+        try:
+            # Session.load only warns when the data is not published yet, so check what we got
+            check_session_data(self.loader(year, event_name, session_name))
+        except Exception as e:
+            with self._lock:
+                self.failed[key] = str(e)
+            return
+        with self._lock:
+            self.loaded.add(key)
+            self.failed.pop(key, None)
+
+    def run_once(self):
+        """
+        Run one prefetch round and wait until it is finished.
+
+        Returns
+        -------
+        loaded : list of tuple
+            (year, event name, session) of the sessions loaded in this
+            round, in the order they were scheduled.
+        """
+        plan = self.current_plan()
+        with self._lock:
+            todo = [key for key in zip(plan['Year'], plan['EventName'], plan['Session'])
+                    if key not in self.loaded]
+
+        # the pool starts the jobs in submission order, which is the priority order of the plan
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prefetch') as pool:
+            for key in todo:
+                if self._stop.is_set():
+                    break
+                pool.submit(self._load, key)
+
+        with self._lock:
+            return [key for key in todo if key in self.loaded]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:  # e.g. the schedule could not be read, try again next round
+                print(f"prefetch round failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the prefetcher in a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='prefetcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop after the current round and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prefetch recent and upcoming F1 sessions into the cache.")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--interval', type=float, default=900, help="seconds between rounds")
+    parser.add_argument('--lookback-days', type=int, default=10)
+    parser.add_argument('--lookahead-days', type=int, default=7)
+    parser.add_argument('--once', action='store_true', help="run a single round and exit")
+    args = parser.parse_args()
+
+    prefetcher = Prefetcher(workers=args.workers, interval=args.interval,
+                            lookback_days=args.lookback_days, lookahead_days=args.lookahead_days)
+    if args.once:
+        for key in prefetcher.run_once():
+            print("cached", *key)
+        for key, error in prefetcher.failed.items():
+            print("failed", *key, error)
+    else:
+        prefetcher.start()
+        try:
+            while True:
+                prefetcher._thread.join(1)
+        except KeyboardInterrupt:
+            prefetcher.stop()
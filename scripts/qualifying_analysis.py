@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from fastf1.core import DataNotLoadedError
+
+from fetch_data import load_session
+
+# Qualifying engine: Q1/Q2/Q3 segments, best sectors, theoretical best lap and the
+# improvement of every driver between segments. All drivers are handled by one grouped
+# pass over the sector columns (no per-driver filtering), so a whole season of qualifying
+# sessions can be summarised in the batch path.
+
+SECTOR_COLUMNS = ['Sector1Time', 'Sector2Time', 'Sector3Time']
+SEGMENTS = ['Q1', 'Q2', 'Q3']
+
+def get_qualifying_laps(session):
+    """
+    Return the qualifying laps in seconds, labelled with their segment.
+
+    Deleted laps (e.g. track limits) are dropped, since neither their lap
+    time nor their sectors count. The segment is taken from FastF1's
+    `split_qualifying_sessions`; if session status data is missing the
+    'Segment' column is NaN and only session-wide results are available.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 qualifying (or sprint qualifying) session.
+
+    Returns
+    -------
+    laps : pandas.DataFrame
+        One row per valid lap with the columns ['Driver', 'Team',
+        'Segment', 'LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time'],
+        times in seconds.
+    """
+    laps = session.laps
+    if 'Deleted' in laps.columns:
+        laps = laps[laps['Deleted'].ne(True)]  # Deleted may also be NaN
+
+    segment = pd.Series(np.nan, index=laps.index, dtype=object)
+    try:
+        for name, segment_laps in zip(SEGMENTS, laps.split_qualifying_sessions()):
+            if segment_laps is not None:
+                segment[segment_laps.index] = name
+    except (ValueError, AttributeError, KeyError, DataNotLoadedError):
+        # no session status data (or not a qualifying session), keep the whole session as one
+        pass
+
+    data = pd.DataFrame({'Driver': laps['Driver'], 'Team': laps['Team'], 'Segment': segment})
+    for col in ['LapTime'] + SECTOR_COLUMNS:
+        data[col] = laps[col].dt.total_seconds()
+    return data
+
+def get_qualifying_summary(session):
+    """
+    Compute best sectors, theoretical best lap and segment progression.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 qualifying session.
+
+    Returns
+    -------
+    summary : pandas.DataFrame
+        One row per driver, sorted by best lap time, with the columns:
+            - 'Driver', 'Team'
+            - 'BestLap' : fastest actual lap in seconds
+            - 'BestS1', 'BestS2', 'BestS3' : best sector times in seconds
+            - 'TheoreticalBest' : sum of the best sectors
+            - 'GapToIdeal' : BestLap - TheoreticalBest
+            - 'Q1', 'Q2', 'Q3' : best lap in each segment (NaN if the
+              driver did not set a time in it)
+            - 'Q1toQ2', 'Q2toQ3' : lap time gained between segments
+              (positive = faster in the later segment)
+        Times in seconds.
+    """
+    laps = get_qualifying_laps(session)
+    return summarize_qualifying_laps(laps)
+
+def summarize_qualifying_laps(laps):
+    """
+    Summarise qualifying laps as returned by `get_qualifying_laps`.
+
+    Everything is computed with two grouped aggregations: one per
+    driver over the whole session and one per driver and segment.
+
+    Parameters
+    ----------
+    laps : pandas.DataFrame
+        Lap table with 'Driver', 'Team', 'Segment', 'LapTime' and the
+        sector columns, times in seconds.
+
+    Returns
+    -------
+    summary : pandas.DataFrame
+        See `get_qualifying_summary`.
+    """
+    best = laps.groupby('Driver', sort=False).agg(
+        Team=('Team', 'first'),
+        BestLap=('LapTime', 'min'),
+        BestS1=('Sector1Time', 'min'),
+        BestS2=('Sector2Time', 'min'),
+        BestS3=('Sector3Time', 'min'),
+    )
+    # min_count so a driver missing a sector gets NaN instead of a too fast "ideal" lap
+    best['TheoreticalBest'] = best[['BestS1', 'BestS2', 'BestS3']].sum(axis=1, min_count=3)
+    best['GapToIdeal'] = best['BestLap'] - best['TheoreticalBest']
+
+    per_segment = (laps.dropna(subset=['Segment'])
+                       .groupby(['Driver', 'Segment'])['LapTime'].min()
+                       .unstack('Segment')
+                       .reindex(columns=SEGMENTS))
+    summary = best.join(per_segment, how='left')
+    for segment in SEGMENTS:
+        if segment not in summary.columns:
+            summary[segment] = np.nan
+
+    summary['Q1toQ2'] = summary['Q1'] - summary['Q2']
+    summary['Q2toQ3'] = summary['Q2'] - summary['Q3']
+
+    return summary.sort_values('BestLap').reset_index()
+
+def summarize_season_qualifying(year, events, session_type="Q", loader=load_session):
+    """
+    Summarise the qualifying sessions of several events of a season.
+
+    Parameters
+    ----------
+    year : int
+        The season.
+    events : iterable of str
+        Grand Prix names as recognized by FastF1.
+    session_type : str, default "Q"
+        "Q" for qualifying or "SQ" for sprint qualifying.
+    loader : callable, default fetch_data.load_session
+        Called as `loader(year, event, session_type)`.
+
+    Returns
+    -------
+    summary : pandas.DataFrame
+        The per-driver summaries of all events concatenated, with an
+        extra 'EventName' column.
+    """
+    summaries = []
+    for event in events:
+        summary = get_qualifying_summary(loader(year, event, session_type))
+        summary.insert(0, 'EventName', event)
+        summaries.append(summary)
+    return pd.concat(summaries, ignore_index=True)
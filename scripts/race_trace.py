@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+from plot_styles import draw_driver_lines, chart_style, new_figure
+
+# Race trace: time gaps between drivers lap by lap, which the position chart cannot show.
+# Everything is computed from one lap x driver matrix of race times with array operations,
+# so it is cheap enough to redo on every new lap (live/replay) or for a whole season.
+
+def get_race_time_matrix(session):
+    """
+    Build a lap by driver matrix of elapsed race time.
+
+    The matrix is built once from `session.laps['Time']` (the session
+    time at which each lap was completed) and shifted so that 0 is the
+    start of the race.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 race session.
+
+    Returns
+    -------
+    race_times : pandas.DataFrame
+        A DataFrame indexed by lap number with one column per driver
+        abbreviation, holding the elapsed race time in seconds at the end
+        of each lap. Laps a driver did not complete (e.g. after retiring)
+        are NaN.
+    """
+    laps = session.laps[['Driver', 'LapNumber', 'Time', 'LapStartTime']]
+
+    # the race starts when the first lap starts, fall back to the first crossing if it is missing
+    race_start = laps.loc[laps['LapNumber'] == 1, 'LapStartTime'].min()
+    if pd.isna(race_start):
+        race_start = pd.Timedelta(0)
+
+    race_times = laps.assign(RaceTime=(laps['Time'] - race_start).dt.total_seconds()) \
+        .pivot_table(index='LapNumber', columns='Driver', values='RaceTime', aggfunc='first')
+
+    # pivot_table drops laps nobody completed, keep the lap axis continuous
+    full_laps = np.arange(1, int(race_times.index.max()) + 1)
+    return race_times.reindex(full_laps)
+
+def compute_race_trace(race_times, reference_pace=None):
+    """
+    Compute gap to leader, interval and gap to a reference pace.
+
+    All values come from array operations on the race time matrix (no
+    loop over drivers or laps):
+
+    - gap to leader: time between the leader and the driver crossing
+      the line at the end of the same lap. For lapped drivers this is
+      larger than a lap time, `LapsDown` tells by how many laps.
+    - interval: time to the car directly ahead among the drivers that
+      completed the same lap, i.e. the car ahead in the running order.
+    - gap to reference: elapsed time minus `lap * reference_pace`. A flat
+      line means the driver ran exactly at the reference pace.
+
+    Retired drivers have NaN from the first lap they did not complete.
+
+    Parameters
+    ----------
+    race_times : pandas.DataFrame
+        Lap by driver matrix of elapsed race time in seconds, as returned
+        by `get_race_time_matrix`.
+    reference_pace : float, optional
+        Reference lap time in seconds. Defaults to the average lap time
+        of the driver who completed the most laps in the least time
+        (normally the winner).
+
+    Returns
+    -------
+    trace : dict of pandas.DataFrame
+        Lap by driver matrices with the keys 'GapToLeader', 'Interval',
+        'GapToReference' (all in seconds) and 'LapsDown'.
+    """
+    times = race_times.to_numpy(dtype=float)
+    lap_numbers = race_times.index.to_numpy(dtype=float)
+    n_laps, n_drivers = times.shape
+
+    completed = ~np.isnan(times)
+    # laps nobody completed would make nanmin warn, mask them instead
+    any_completed = completed.any(axis=1)
+    leader = np.full(n_laps, np.nan)
+    leader[any_completed] = np.nanmin(times[any_completed], axis=1)
+
+    gap_to_leader = times - leader[:, None]
+
+    # interval: sort every lap by crossing time (NaN last), diff to the previous car, scatter back
+    order = np.argsort(np.where(completed, times, np.inf), axis=1)
+    sorted_times = np.take_along_axis(times, order, axis=1)
+    sorted_interval = np.full_like(sorted_times, np.nan)
+    sorted_interval[:, 1:] = np.diff(sorted_times, axis=1)
+    sorted_interval[:, 0] = np.where(np.isnan(sorted_times[:, 0]), np.nan, 0.0)
+    interval = np.empty_like(sorted_interval)
+    np.put_along_axis(interval, order, sorted_interval, axis=1)
+
+    # laps down: how many more laps the leader had completed when the driver finished this lap
+    leader_crossings = leader[any_completed]
+    leader_laps = lap_numbers[any_completed]
+    crossed = np.searchsorted(leader_crossings, np.where(completed, times, np.inf), side='right')
+    crossed = np.clip(crossed, 1, len(leader_laps))
+    laps_down = np.where(completed, leader_laps[crossed - 1] - lap_numbers[:, None], np.nan)
+
+    if reference_pace is None:
+        last_laps = np.where(completed, lap_numbers[:, None], 0).max(axis=0)
+        final_times = np.nanmax(np.where(completed, times, -np.inf), axis=0)
+        # most laps first, then least time
+        winner = np.lexsort((final_times, -last_laps))[0]
+        reference_pace = final_times[winner] / last_laps[winner]
+
+    gap_to_reference = times - lap_numbers[:, None] * reference_pace
+
+    def as_frame(values):
+        return pd.DataFrame(values, index=race_times.index, columns=race_times.columns)
+
+    return {
+        'GapToLeader': as_frame(gap_to_leader),
+        'Interval': as_frame(interval),
+        'GapToReference': as_frame(gap_to_reference),
+        'LapsDown': as_frame(laps_down),
+    }
+
+def get_race_trace_table(session, reference_pace=None):
+    """
+    Return the race trace of a session as a long table.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 race session.
+    reference_pace : float, optional
+        Reference lap time in seconds, see `compute_race_trace`.
+
+    Returns
+    -------
+    table : pandas.DataFrame
+        One row per driver and completed lap with the columns
+        ['LapNumber', 'Driver', 'RaceTime', 'GapToLeader', 'Interval',
+        'GapToReference', 'LapsDown'].
+    """
+    race_times = get_race_time_matrix(session)
+    trace = compute_race_trace(race_times, reference_pace=reference_pace)
+
+    table = pd.concat({'RaceTime': race_times, **trace}, axis=1).stack(level=1, future_stack=True)
+    table = table.dropna(subset=['RaceTime'])
+    table.index.names = ['LapNumber', 'Driver']
+    return table.reset_index()
+
+def plot_race_trace(session):
+    """
+    Plot every driver's gap to the winner's average pace lap by lap.
+
+    The y-axis is inverted, so a line going down means the driver was
+    slower than the reference pace on those laps, a line going up means
+    faster. Pit stops show as steps down, safety car periods as all
+    lines dropping and bunching together.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 race session.
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+        The Matplotlib figure containing the race trace.
+    """
+    race_times = get_race_time_matrix(session)
+    gaps = compute_race_trace(race_times)['GapToReference']
+    values = gaps.to_numpy(dtype=float)
+
+    with chart_style():
+        fig, ax = new_figure(figsize=(10, 5))
+
+        ax.set_title("Race trace: gap to the winner's average pace")
+        draw_driver_lines(ax, gaps, session)
+        ax.set_ylim(np.nanmin(values) - 5, np.nanmax(values) + 5)
+
+        # slower drivers further down, like in the position chart
+        ax.invert_yaxis()
+        ax.set_xlabel('Lap')
+        ax.set_ylabel('Gap (s)')
+        fig.tight_layout()
+
+    return fig
@@ -0,0 +1,357 @@
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import fastf1
+
+from fetch_data import load_session
+from top2_drivers_best_laps_comparison import get_lap_car_data
+
+# resource only exists on Unix, without it the memory limit option is ignored
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Season-wide telemetry statistics without holding every session's car data in memory.
+# Each worker process loads one session, streams its laps one at a time through
+# get_lap_car_data and folds them into small mergeable summaries (fixed-bin histograms and
+# running moments). Only those summaries travel back to the parent, where they are merged.
+
+SPEED_BINS = np.arange(0, 402, 2)        # km/h, 2 km/h resolution
+DISTANCE_BINS = np.arange(0, 1005, 5)    # m, braking zone length
+
+FULL_THROTTLE = 99  # percent
+
+class TelemetrySummary:
+    """
+    Mergeable summary of a stream of values.
+
+    Keeps a fixed-bin histogram (which also serves as quantile sketch,
+    with an error of at most one bin width) and running moments (count,
+    mean, variance, min, max). Two summaries over the same bins can be
+    merged, so partial results from different laps, sessions or worker
+    processes combine into the exact same result as one pass over all
+    the data.
+
+    Parameters
+    ----------
+    bins : numpy.ndarray
+        Histogram bin edges. Values outside are counted in the first or
+        last bin.
+    """
+
+    def __init__(self, bins):
+        self.bins = bins
+        self.counts = np.zeros(len(bins) - 1, dtype=np.int64)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Add a chunk of values (NaN are ignored)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        chunk = TelemetrySummary(self.bins)
+        idx = np.clip(np.searchsorted(self.bins, values, side='right') - 1, 0, len(self.counts) - 1)
+        chunk.counts = np.bincount(idx, minlength=len(self.counts))
+        chunk.n = values.size
+        chunk.mean = values.mean()
+        chunk.m2 = ((values - chunk.mean) ** 2).sum()
+        chunk.min = values.min()
+        chunk.max = values.max()
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Merge another summary over the same bins into this one."""
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        # parallel variance update (Chan et al.)
+        self.m2 += other.m2 + delta ** 2 * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+        self.counts = self.counts + other.counts
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.n) if self.n else np.nan
+
+    def quantile(self, q):
+        """Estimate a quantile (0-1) from the histogram."""
+        if self.n == 0:
+            return np.nan
+        cumulative = np.cumsum(self.counts)
+        target = q * self.n
+        i = int(np.searchsorted(cumulative, target))
+        i = min(i, len(self.counts) - 1)
+        # linear interpolation inside the bin
+        below = cumulative[i - 1] if i > 0 else 0
+        inside = (target - below) / self.counts[i] if self.counts[i] else 0.0
+        value = self.bins[i] + inside * (self.bins[i + 1] - self.bins[i])
+        return float(np.clip(value, self.min, self.max))
+
+class SeasonTelemetry:
+    """
+    Mergeable season telemetry statistics.
+
+    Per circuit: speed distribution, distribution of each lap's top
+    speed and time spent at full throttle. Per driver: braking zones
+    per lap, speed at the start of each braking zone and braking zone
+    length.
+    """
+
+    def __init__(self):
+        self.speed = {}
+        self.top_speed = {}
+        self.full_throttle = {}     # circuit -> [seconds at full throttle, seconds total]
+        self.brake_entry_speed = {}
+        self.brake_distance = {}
+        self.laps = {}              # driver -> laps processed
+
+    @staticmethod
+    def _summary(store, key, bins):
+        if key not in store:
+            store[key] = TelemetrySummary(bins)
+        return store[key]
+
+    def add_lap(self, car, circuit, driver):
+        """
+        Fold the car data of one lap into the statistics.
+
+        Parameters
+        ----------
+        car : pandas.DataFrame
+            Car data of one lap with 'Speed', 'Throttle', 'Brake', 'Time'
+            and 'Distance', as returned by `get_lap_car_data`.
+        circuit : str
+            Circuit (event) the lap belongs to.
+        driver : str
+            Driver abbreviation.
+        """
+        speed = car['Speed'].to_numpy(dtype=float)
+        if speed.size < 2:
+            return
+
+        self._summary(self.speed, circuit, SPEED_BINS).update(speed)
+        self._summary(self.top_speed, circuit, SPEED_BINS).update([np.nanmax(speed)])
+
+        # time weighted, the samples are not equally spaced
+        time = car['Time'].dt.total_seconds().to_numpy()
+        dt = np.diff(time)
+        full = car['Throttle'].to_numpy(dtype=float)[:-1] >= FULL_THROTTLE
+        totals = self.full_throttle.setdefault(circuit, [0.0, 0.0])
+        totals[0] += dt[full].sum()
+        totals[1] += dt.sum()
+
+        # braking zones are runs of consecutive samples with the brake on
+        brake = car['Brake'].to_numpy(dtype=bool)
+        edges = np.diff(np.concatenate([[False], brake, [False]]).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        distance = car['Distance'].to_numpy(dtype=float)
+
+        self._summary(self.brake_entry_speed, driver, SPEED_BINS).update(speed[starts])
+        self._summary(self.brake_distance, driver, DISTANCE_BINS).update(distance[ends] - distance[starts])
+        self.laps[driver] = self.laps.get(driver, 0) + 1
+
+    def merge(self, other):
+        """Merge the statistics of another `SeasonTelemetry` into this one."""
+        for name in ('speed', 'top_speed', 'brake_entry_speed', 'brake_distance'):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            for key, summary in theirs.items():
+                if key in mine:
+                    mine[key].merge(summary)
+                else:
+                    mine[key] = summary
+        for circuit, (full, total) in other.full_throttle.items():
+            totals = self.full_throttle.setdefault(circuit, [0.0, 0.0])
+            totals[0] += full
+            totals[1] += total
+        for driver, laps in other.laps.items():
+            self.laps[driver] = self.laps.get(driver, 0) + laps
+        return self
+
+    def circuit_table(self):
+        """
+        Return the per-circuit statistics.
+
+        Returns
+        -------
+        table : pandas.DataFrame
+            One row per circuit with the lap count, mean and 99th
+            percentile speed, median and maximum top speed per lap and
+            the percentage of time at full throttle.
+        """
+        rows = []
+        for circuit, speed in self.speed.items():
+            top = self.top_speed[circuit]
+            full, total = self.full_throttle[circuit]
+            rows.append({
+                'Circuit': circuit,
+                'Laps': top.n,
+                'MeanSpeed': speed.mean,
+                'P99Speed': speed.quantile(0.99),
+                'MedianTopSpeed': top.quantile(0.5),
+                'MaxTopSpeed': top.max,
+                'FullThrottle %': 100 * full / total if total else np.nan,
+            })
+        return pd.DataFrame(rows, columns=['Circuit', 'Laps', 'MeanSpeed', 'P99Speed',
+                                           'MedianTopSpeed', 'MaxTopSpeed', 'FullThrottle %'])
+
+    def driver_braking_table(self):
+        """
+        Return the per-driver braking statistics.
+
+        Returns
+        -------
+        table : pandas.DataFrame
+            One row per driver with the laps processed, braking zones per
+            lap, mean and median speed at the start of braking and mean
+            and median braking zone length.
+        """
+        rows = []
+        for driver, entry in self.brake_entry_speed.items():
+            length = self.brake_distance[driver]
+            rows.append({
+                'Driver': driver,
+                'Laps': self.laps[driver],
+                'BrakingZonesPerLap': entry.n / self.laps[driver],
+                'MeanEntrySpeed': entry.mean,
+                'MedianEntrySpeed': entry.quantile(0.5),
+                'MeanBrakingDistance': length.mean,
+                'MedianBrakingDistance': length.quantile(0.5),
+            })
+        return pd.DataFrame(rows, columns=['Driver', 'Laps', 'BrakingZonesPerLap', 'MeanEntrySpeed',
+                                           'MedianEntrySpeed', 'MeanBrakingDistance', 'MedianBrakingDistance'])
+
+def aggregate_session(session, circuit=None):
+    """
+    Stream all timed laps of a loaded session into a `SeasonTelemetry`.
+
+    Only one lap's car data is materialised at a time.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A session loaded with telemetry.
+    circuit : str, optional
+        Key to group the circuit statistics by, defaults to the event name.
+
+    Returns
+    -------
+    stats : SeasonTelemetry
+        The statistics of this session.
+    """
+    stats = SeasonTelemetry()
+    circuit = circuit or session.event['EventName']
+
+    # not pick_not_deleted(): 'Deleted' is all None when race control messages are not loaded,
+    # and not iterlaps(require=...), which fails with current pandas
+    laps = session.laps
+    keep = laps['LapTime'].notna()
+    if 'Deleted' in laps.columns:
+        keep &= laps['Deleted'].ne(True)
+    laps = laps[keep]
+
+    for _, lap in laps.iterlaps():
+        try:
+            car = get_lap_car_data(lap)
+        except ValueError:  # no telemetry for this lap
+            continue
+        stats.add_lap(car, circuit, lap['Driver'])
+    return stats
+
+def _limit_memory(memory_limit_mb):
+    # worker initializer: hard cap of the address space of each worker process
+    if memory_limit_mb and resource is not None:
+        limit = int(memory_limit_mb * 1024 ** 2)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _aggregate_event(year, event, session_type):
+    # runs in a worker process, only the small summaries are sent back
+    session = load_session(year, event, session_type, weather=False, messages=False)
+    return aggregate_session(session, circuit=event)
+
+def aggregate_season(year, events=None, session_type="R", workers=2, memory_limit_mb=None):
+    """
+    Aggregate the telemetry of a whole season across worker processes.
+
+    Every worker handles one session at a time and is replaced after
+    each session, so memory use stays bounded by `workers` loaded
+    sessions no matter how many sessions are processed.
+
+    Parameters
+    ----------
+    year : int
+        The season.
+    events : iterable of str, optional
+        Grand Prix names, by default every event of the season that has
+        already taken place.
+    session_type : str, default "R"
+        Session to aggregate for each event.
+    workers : int, default 2
+        Number of worker processes.
+    memory_limit_mb : float, optional
+        Address space limit per worker (Unix only). A session that does
+        not fit fails instead of pushing the machine into swap.
+
+    Returns
+    -------
+    stats : SeasonTelemetry
+        The merged statistics.
+    failed : dict
+        Event name -> error message for sessions that could not be
+        aggregated.
+    """
+    if events is None:
+        schedule = fastf1.get_event_schedule(year, include_testing=False)
+        events = schedule.loc[schedule['EventDate'] < pd.Timestamp.now(), 'EventName'].tolist()
+    events = list(events)
+
+    pool_kwargs = {'max_workers': workers, 'initializer': _limit_memory, 'initargs': (memory_limit_mb,)}
+    if sys.version_info >= (3, 11):
+        pool_kwargs['max_tasks_per_child'] = 1
+        batches = [events]
+    else:
+        # no max_tasks_per_child before Python 3.11: a fresh pool for every `workers` sessions
+        batches = [events[i:i + workers] for i in range(0, len(events), workers)]
+
+    stats = SeasonTelemetry()
+    failed = {}
+    for batch in batches:
+        with ProcessPoolExecutor(**pool_kwargs) as pool:
+            futures = {pool.submit(_aggregate_event, year, event, session_type): event for event in batch}
+            for future in as_completed(futures):
+                try:
+                    stats.merge(future.result())
+                except Exception as e:
+                    failed[futures[future]] = str(e)
+    return stats, failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aggregate season telemetry statistics.")
+    parser.add_argument('year', type=int)
+    parser.add_argument('--session', default="R")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--memory-limit-mb', type=float, default=None)
+    args = parser.parse_args()
+
+    stats, failed = aggregate_season(args.year, session_type=args.session,
+                                     workers=args.workers, memory_limit_mb=args.memory_limit_mb)
+    print(stats.circuit_table().round(2).to_string(index=False))
+    print()
+    print(stats.driver_braking_table().round(2).to_string(index=False))
+    for event, error in failed.items():
+        print(f"failed {event}: {error}")
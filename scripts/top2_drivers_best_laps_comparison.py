@@ -1,5 +1,28 @@
 import fastf1
-import matplotlib.pyplot as plt
+
+from plot_styles import get_team_colors, chart_style, new_figure
+from lap_index import get_lap_index
+
+def get_lap_car_data(lap):
+    """
+    Return the car telemetry of a single lap with the driven distance.
+
+    Only the samples of this lap are sliced out of the session's car
+    data, which keeps the per-lap path cheap enough to stream over many
+    laps (see `season_telemetry`).
+
+    Parameters
+    ----------
+    lap : fastf1.core.Lap
+        A single lap of a loaded session.
+
+    Returns
+    -------
+    car : fastf1.core.Telemetry
+        Car data of the lap (Speed, RPM, nGear, Throttle, Brake, DRS,
+        Time...) with an added 'Distance' column in metres.
+    """
+    return lap.get_car_data().add_distance()
 
 def prepare_driver_data_for_plotting(session):
     """
@@ -37,7 +60,8 @@ def prepare_driver_data_for_plotting(session):
     vmaxs : list of float
         Maximum speed values observed for each of the two drivers.
     """
-    laps_clean = session.laps[session.laps['LapTime'].notna()]
+    index = get_lap_index(session)
+    laps_clean = index.select(index.flag('valid_time'))
 
     # gets only the data the 2 fastest driverss to later fetch their data 
     top2 = (laps_clean.groupby('Driver')['LapTime']
@@ -49,11 +73,12 @@ def prepare_driver_data_for_plotting(session):
     # prepare the dictionary for both drivers
     driver_data = {}
     vmins, vmaxs = [], [] #used for plot range of the minspeed and max speed
+    team_colors = get_team_colors(session)
 
     for drv in drivers:
-        lap = session.laps.pick_driver(drv).pick_fastest()
-        car = lap.get_car_data().add_distance() #get car data and the distance
-        color = fastf1.plotting.get_team_color(lap['Team'], session=session) 
+        lap = index.fastest(index.driver(drv))
+        car = get_lap_car_data(lap) #get car data and the distance
+        color = team_colors.get(lap['Team'], 'grey')
         label = f"{drv}  ({str(lap['LapTime']).split()[-1]})"
         driver_data[drv] = {'car': car, 'color': color, 'label': label}
         vmins.append(car['Speed'].min())
@@ -100,27 +125,27 @@ def plot_2_fastest_laps_comparison_side_by_side(session):
     # Corner info
     circuit_info = session.get_circuit_info()
 
-    # plot
-    fig, ax = plt.subplots(figsize=(10, 5))
+    with chart_style():
+        fig, ax = new_figure(figsize=(10, 5))
 
-    # plot both lines
-    for drv, info in driver_data.items():
-        car = info['car']
-        ax.plot(car['Distance'], car['Speed'],
-                color=info['color'], linewidth=1.8, label=info['label'])
+        # plot both lines
+        for drv, info in driver_data.items():
+            car = info['car']
+            ax.plot(car['Distance'], car['Speed'],
+                    color=info['color'], linewidth=1.8, label=info['label'])
 
-    # Vertical dotted lines for corners
-    v_min = min(vmins)
-    v_max = max(vmaxs)
-    ax.vlines(x=circuit_info.corners['Distance'],
-            ymin=v_min-20, ymax=v_max+20,
-            linestyles='dotted', colors='grey')
+        # Vertical dotted lines for corners
+        v_min = min(vmins)
+        v_max = max(vmaxs)
+        ax.vlines(x=circuit_info.corners['Distance'],
+                ymin=v_min-20, ymax=v_max+20,
+                linestyles='dotted', colors='grey')
 
 
-    # Labels, legend, limits
-    ax.set_xlabel('Distance along track (m)')
-    ax.set_ylabel('Speed in km/h')
-    ax.legend(title='Driver (best lap)')
-    ax.set_ylim([v_min - 40, v_max + 20])
+        # Labels, legend, limits
+        ax.set_xlabel('Distance along track (m)')
+        ax.set_ylabel('Speed in km/h')
+        ax.legend(title='Driver (best lap)')
+        ax.set_ylim([v_min - 40, v_max + 20])
 
     return (the_fastest_of_two, the_second_driver, fig)
\ No newline at end of file
@@ -0,0 +1,293 @@
+import threading
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import LineCollection
+
+import fastf1.mvapi
+
+from cache_manager import PROJECT_ROOT
+from plot_styles import chart_style, new_figure
+from lap_index import get_lap_index
+
+# Speed/gear coloured circuit map. The circuit outline is built once per circuit from the
+# X/Y position data (tens of thousands of samples) and reduced to a fixed number of points.
+# It is kept in memory and on disk, so later sessions and years on the same layout reuse it.
+# Drawing a lap then only interpolates its telemetry onto those points: one LineCollection.
+
+TRACK_MAP_DIR = PROJECT_ROOT / "external_data" / "track_maps"
+
+# number of points of the simplified outline, enough for a smooth map at dashboard size
+OUTLINE_POINTS = 400
+
+_outlines = {}
+_outlines_lock = threading.Lock()
+# raw MultiViewer circuit info per (year, circuit key)
+_circuit_infos = {}
+_circuit_infos_lock = threading.Lock()
+
+def get_circuit_key(session):
+    """
+    Return an identifier of the circuit of a session.
+
+    The circuit key of the F1 timing data is used when available, it stays
+    the same over the years. Otherwise the event location is used.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session.
+
+    Returns
+    -------
+    key : str
+        A file-name safe circuit identifier.
+    """
+    try:
+        key = session.session_info['Meeting']['Circuit']['Key']
+    except (AttributeError, KeyError, TypeError):
+        key = session.event['Location']
+    return str(key).replace(' ', '_').replace('/', '_')
+
+def get_circuit_info(session):
+    """
+    Return the MultiViewer circuit info (corners, rotation) of a session.
+
+    Unlike `Session.get_circuit_info` this does not compute the distance
+    of every corner from the fastest lap's telemetry, and the result is
+    kept per year and circuit, so it is requested once and then free.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session.
+
+    Returns
+    -------
+    circuit_info : fastf1.mvapi.CircuitInfo or None
+        None if the session has no circuit key or the request failed.
+    """
+    try:
+        circuit = session.session_info['Meeting']['Circuit']
+        circuit_key = circuit['Key']
+    except (AttributeError, KeyError, TypeError):
+        return None
+    # same correction as Session.get_circuit_info, Mugello shares its key with another circuit
+    if circuit_key == 149 and circuit.get('ShortName') == 'Mugello':
+        circuit_key = 146
+    key = (session.event.year, circuit_key)
+
+    with _circuit_infos_lock:
+        if key in _circuit_infos:
+            return _circuit_infos[key]
+
+    # the request runs without the lock, a failed one (None) is not kept and retried next time
+    circuit_info = fastf1.mvapi.get_circuit_info(year=key[0], circuit_key=key[1])
+    if circuit_info is not None:
+        with _circuit_infos_lock:
+            _circuit_infos[key] = circuit_info
+    return circuit_info
+
+def get_layout_key(session):
+    """
+    Return an identifier of the circuit layout of a session.
+
+    The circuit key stays the same when a circuit is rebuilt (e.g.
+    Albert Park 2022, Barcelona 2023), so the number of corners of the
+    layout is added to it. A changed layout gets its own outline instead
+    of reusing the old geometry. Without circuit info the year is used
+    instead of the number of corners.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session.
+
+    Returns
+    -------
+    key : str
+        A file-name safe layout identifier, e.g. '10_14c' or '10_2024'.
+    """
+    circuit_info = get_circuit_info(session)
+    if circuit_info is None:
+        return f"{get_circuit_key(session)}_{session.event.year}"
+    return f"{get_circuit_key(session)}_{len(circuit_info.corners)}c"
+
+def _rotate(xy, angle_deg):
+    angle = np.deg2rad(angle_deg)
+    rotation = np.array([[np.cos(angle), np.sin(angle)],
+                         [-np.sin(angle), np.cos(angle)]])
+    return xy @ rotation
+
+def build_circuit_outline(session, n_points=OUTLINE_POINTS):
+    """
+    Build a simplified circuit outline from the fastest lap's positions.
+
+    The X/Y samples are resampled to `n_points` points equally spaced
+    along the lap and rotated like the official track map (not rotated
+    if the circuit info is not available).
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session with position data.
+    n_points : int, default OUTLINE_POINTS
+        Number of points of the outline.
+
+    Returns
+    -------
+    outline : dict
+        - 'points' : numpy array (n_points, 2), rotated X/Y in metres/10
+        - 'fraction' : numpy array (n_points,), position of each point
+          along the lap from 0 to 1
+        - 'segments' : numpy array (n_points - 1, 2, 2), consecutive point
+          pairs ready for a LineCollection
+    """
+    lap = session.laps.pick_fastest()
+    pos = lap.get_pos_data()
+    xy = pos[['X', 'Y']].to_numpy(dtype=float)
+
+    # arc length along the samples, then equally spaced points on it
+    step = np.linalg.norm(np.diff(xy, axis=0), axis=1)
+    arc = np.concatenate([[0.0], np.cumsum(step)])
+    fraction = np.linspace(0.0, 1.0, n_points)
+    target = fraction * arc[-1]
+    points = np.column_stack([np.interp(target, arc, xy[:, 0]),
+                              np.interp(target, arc, xy[:, 1])])
+
+    circuit_info = get_circuit_info(session)
+    if circuit_info is not None:
+        points = _rotate(points, circuit_info.rotation)
+
+    segments = np.stack([points[:-1], points[1:]], axis=1)
+    return {'points': points, 'fraction': fraction, 'segments': segments}
+
+def get_circuit_outline(session, rebuild=False):
+    """
+    Return the cached outline of the session's circuit layout, building it once.
+
+    The outline is looked up in memory, then on disk in
+    `external_data/track_maps`, and only built from position data if
+    neither has it.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A loaded FastF1 session.
+    rebuild : bool, default False
+        Build the outline again, e.g. after the position data was corrected.
+
+    Returns
+    -------
+    outline : dict
+        See `build_circuit_outline`.
+    """
+    key = get_layout_key(session)
+    path = TRACK_MAP_DIR / f"{key}.npz"
+
+    if not rebuild:
+        with _outlines_lock:
+            if key in _outlines:
+                return _outlines[key]
+            if path.is_file():
+                with np.load(path) as data:
+                    _outlines[key] = {name: data[name] for name in ('points', 'fraction', 'segments')}
+                return _outlines[key]
+
+    # building loads telemetry, do it without the lock so other circuits are not blocked.
+    # Two threads may build the same outline at once, they get the same result.
+    outline = build_circuit_outline(session)
+    with _outlines_lock:
+        TRACK_MAP_DIR.mkdir(parents=True, exist_ok=True)
+        np.savez(path, **outline)
+        _outlines[key] = outline
+    return outline
+
+def project_lap_onto_outline(lap, outline, channel='Speed'):
+    """
+    Sample a telemetry channel of a lap at the outline points.
+
+    The car data is matched to the outline by the fraction of the lap
+    distance covered, so the cost only depends on the size of the car
+    data and the fixed number of outline points.
+
+    Parameters
+    ----------
+    lap : fastf1.core.Lap
+        The lap to project.
+    outline : dict
+        Circuit outline from `get_circuit_outline`.
+    channel : str, default 'Speed'
+        Car data channel, e.g. 'Speed', 'nGear' or 'Throttle'.
+
+    Returns
+    -------
+    values : numpy.ndarray
+        One value per outline segment.
+    """
+    car = lap.get_car_data().add_distance()
+    distance = car['Distance'].to_numpy(dtype=float)
+    fraction = distance / distance[-1]
+
+    # value at the middle of every segment
+    mid = (outline['fraction'][:-1] + outline['fraction'][1:]) / 2
+    values = np.interp(mid, fraction, car[channel].to_numpy(dtype=float))
+    if channel == 'nGear':
+        values = np.round(values)
+    return values
+
+def plot_track_map(session, driver=None, channel='Speed'):
+    """
+    Plot the circuit coloured by speed (or gear) of one lap.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 session with telemetry.
+    driver : str, optional
+        Driver abbreviation. The fastest lap of this driver is drawn,
+        by default the fastest lap of the session.
+    channel : str, default 'Speed'
+        'Speed' for a continuous colour scale or 'nGear' for gears.
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+        The Matplotlib figure containing the track map.
+    """
+    outline = get_circuit_outline(session)
+
+    index = get_lap_index(session)
+    lap = index.fastest(None if driver is None else index.driver(driver))
+    values = project_lap_onto_outline(lap, outline, channel=channel)
+
+    if channel == 'nGear':
+        # one colour per gear
+        cmap, norm_range, label = colormaps['Paired'].resampled(8), (0.5, 8.5), 'Gear'
+    else:
+        cmap, norm_range, label = 'plasma', (values.min(), values.max()), 'Speed (km/h)'
+
+    with chart_style():
+        fig, ax = new_figure(figsize=(8, 6))
+
+        # a thick black line under the coloured one as track edge
+        ax.add_collection(LineCollection(outline['segments'], colors='black', linewidths=7,
+                                         capstyle='round'))
+        lines = LineCollection(outline['segments'], cmap=cmap, linewidths=4, capstyle='round')
+        lines.set_array(values)
+        lines.set_clim(*norm_range)
+        ax.add_collection(lines)
+
+        ax.autoscale_view()
+        ax.set_aspect('equal')
+        ax.axis('off')
+        ax.set_title(f"{session.event['EventName']} {session.event['EventDate'].year} {session.name}\n"
+                     f"{lap['Driver']} - {str(lap['LapTime']).split()[-1]}")
+
+        cbar = fig.colorbar(lines, ax=ax, shrink=0.7)
+        cbar.set_label(label)
+        if channel == 'nGear':
+            cbar.set_ticks(np.arange(1, 9))
+        fig.tight_layout()
+
+    return fig
@@ -1,5 +1,5 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from cycler import cycler
 
 import pandas as pd
 from timple.timedelta import strftimedelta
@@ -11,6 +11,15 @@ import fastf1
 import fastf1.plotting
 from fastf1.core import Laps
 
+from plot_styles import chart_style, new_figure
+
+def _seaborn_theme(style, palette="deep"):
+    # rcParams of sns.set_theme(style=..., palette=...), to be applied in a scoped chart_style instead of globally
+    theme = dict(sns.plotting_context("notebook"))
+    theme.update(sns.axes_style(style))
+    theme['axes.prop_cycle'] = cycler(color=sns.color_palette(palette))
+    return theme
+
 # method to improve code reusibility
 def get_laps_data(session):
     """
@@ -33,13 +42,40 @@ def get_laps_data(session):
         ['Driver', 'LapTime', 'Compound', 'Stint'].
     """
 
-    plt.rcdefaults() #Used to reset the grid to default, beacause some styles may  have been set globally by fastf1.plottting
-
     laps = session.laps.pick_quicklaps() #Getting only the valid laps for each driver as they are the most relevant, (excluding ones like under security car or entering and exiting pits)
     # making a copy as not to work with the original data set
     laps_data = laps[['Driver', 'LapTime', 'Compound', 'Stint']].copy()
     return laps_data
 
+def get_stint_table(session):
+    """
+    Summarise every driver's stints in a table.
+
+    One row is returned per driver and stint with the compound used,
+    the first and last lap of the stint and its length. All laps are
+    used (not only quick laps) so the stint boundaries match the race.
+
+    Parameters
+    ----------
+    session : fastf1.core.Session
+        A fully loaded FastF1 session containing stint information.
+
+    Returns
+    -------
+    stints : pandas.DataFrame
+        A DataFrame with the columns
+        ['Driver', 'Stint', 'Compound', 'FirstLap', 'LastLap', 'Laps'].
+    """
+    laps = session.laps[['Driver', 'Stint', 'Compound', 'LapNumber']].dropna(subset=['Stint'])
+
+    stints = (laps.groupby(['Driver', 'Stint'], sort=True)
+                  .agg(Compound=('Compound', 'first'),
+                       FirstLap=('LapNumber', 'min'),
+                       LastLap=('LapNumber', 'max'),
+                       Laps=('LapNumber', 'count'))
+                  .reset_index())
+    return stints
+
 # this plot uses seaborn in  comparison to the one below which uses matplotlib. This one is simpler and more intuitive to understand, but sacrifices the stint data
 def plot_sessions_tyre_choices_using_seaborn(session):
     """
@@ -64,19 +100,19 @@ def plot_sessions_tyre_choices_using_seaborn(session):
     laps_data = get_laps_data(session=session) #Getting the lap data from the custom method
     laps_data['LapTime'] = laps_data['LapTime'].dt.total_seconds() # convert laptimes in seconds
 
-    sns.set_theme(style="whitegrid", palette = "dark")
-    plt.rcdefaults()
-    fig, ax = plt.subplots(figsize=(16, 7))
+    with chart_style():
+        fig, ax = new_figure(figsize=(16, 7))
 
-    sns.swarmplot(
-        data=laps_data, 
-        x='Driver',    
-        y='LapTime',   
-        hue='Compound',  
-        ax=ax          
-    )
+        sns.swarmplot(
+            data=laps_data, 
+            x='Driver',    
+            y='LapTime',   
+            hue='Compound',  
+            ax=ax          
+        )
+
+        ax.set(ylabel="Lap Time (seconds)", xlabel="Driver")
 
-    ax.set(ylabel="Lap Time (seconds)", xlabel="Driver")
     fastest_driver_name = laps_data.loc[laps_data['LapTime'].idxmin(), 'Driver']
     return (fig, fastest_driver_name)
 
@@ -102,20 +138,20 @@ def tyre_stint_distribution(session):
 
     stint_counts = laps_data.groupby('Driver')['Stint'].nunique().reset_index()
 
-    sns.set_theme(style="darkgrid")
-
-    fig, ax = plt.subplots(figsize=(16, 7))
+    # seaborn's darkgrid theme, only for this figure
+    with chart_style(_seaborn_theme("darkgrid")):
+        fig, ax = new_figure(figsize=(16, 7))
 
-    sns.barplot(
-        data=stint_counts,
-        x='Driver',
-        y='Stint',     
-        ax=ax,
-        palette="dark"
-    )
+        sns.barplot(
+            data=stint_counts,
+            x='Driver',
+            y='Stint',     
+            ax=ax,
+            palette="dark"
+        )
 
-    ax.set_title("Number of Stints per Driver")
-    ax.set_ylabel("Number of Stints") 
+        ax.set_title("Number of Stints per Driver")
+        ax.set_ylabel("Number of Stints") 
 
     # pass the fig object to Streamlit
     return (fig)
@@ -149,31 +185,31 @@ def plot_sessions_tyre_compounds_and_stints(session):
     marker_map = {'HARD': 'o', 'MEDIUM': '+', 'SOFT': '^'} 
     laps_data['TyreMarker'] = laps_data['Compound'].map(marker_map) #marks every occurence of compunds into the value pair specified on the dictionary above
 
-    plt.style.use('default')
-    fig, ax = plt.subplots(figsize=(10, 5))
-
-    for compound, marker in marker_map.items():
-        subset = laps_data[laps_data['Compound'] == compound] # filter based on the current compound on the loop 
-        sc = ax.scatter(
-            subset['Driver'], 
-            subset['LapTime'],
-            c=subset['Stint'],  # color by stint number
-            cmap='plasma',  
-            marker=marker, # shape by tyre compound
-            alpha=1,
-            label=compound
-        )
+    with chart_style():
+        fig, ax = new_figure(figsize=(10, 5))
+
+        for compound, marker in marker_map.items():
+            subset = laps_data[laps_data['Compound'] == compound] # filter based on the current compound on the loop 
+            sc = ax.scatter(
+                subset['Driver'], 
+                subset['LapTime'],
+                c=subset['Stint'],  # color by stint number
+                cmap='plasma',  
+                marker=marker, # shape by tyre compound
+                alpha=1,
+                label=compound
+            )
 
-    cbar = plt.colorbar(sc, ax=ax)
-    cbar.set_label("Stint Number")
+        cbar = fig.colorbar(sc, ax=ax)
+        cbar.set_label("Stint Number")
 
-    ax.set_xlabel("Driver")
-    ax.set_ylabel("Lap Time (s)")
-    ax.set_title("Lap Times by Driver, Tyre Compound, and Stint")
+        ax.set_xlabel("Driver")
+        ax.set_ylabel("Lap Time (s)")
+        ax.set_title("Lap Times by Driver, Tyre Compound, and Stint")
 
-    ax.legend(title="Tyre Compound")
+        ax.legend(title="Tyre Compound")
 
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
 
     return fig
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from prefetch import Prefetcher
+
+
+class StandInSession:
+    # what the loader returns: laps and car data, possibly empty like a session that is not published yet
+    def __init__(self, laps=1, telemetry=True):
+        self.laps = pd.DataFrame({'LapNumber': range(1, laps + 1)})
+        self.car_data = {'1': object()} if telemetry else {}
+
+
+def schedule(year):
+    return pd.DataFrame({
+        'EventName': ['Test Grand Prix'],
+        'EventDate': [pd.Timestamp('2024-06-09')],
+        'Session1': ['Qualifying'],
+        'Session1DateUtc': [pd.Timestamp('2024-06-08 14:00')],
+        'Session2': ['Race'],
+        'Session2DateUtc': [pd.Timestamp('2024-06-09 14:00')],
+    })
+
+
+def make_prefetcher(loader):
+    return Prefetcher(workers=1, get_schedule=schedule, loader=loader,
+                      clock=lambda: pd.Timestamp('2024-06-10 12:00'))
+
+
+def test_loaded_sessions_are_not_loaded_again():
+    calls = []
+
+    def loader(year, event_name, session):
+        calls.append(session)
+        return StandInSession()
+
+    prefetcher = make_prefetcher(loader)
+    assert prefetcher.run_once() == [(2024, 'Test Grand Prix', 'Race'), (2024, 'Test Grand Prix', 'Qualifying')]
+    assert prefetcher.run_once() == []
+    assert calls == ['Race', 'Qualifying']
+
+
+def test_session_without_data_is_failed_and_retried():
+    published = {'Race': False, 'Qualifying': True}
+
+    def loader(year, event_name, session):
+        # Session.load does not raise for unpublished data, it returns an empty session
+        return StandInSession(laps=5 if published[session] else 0)
+
+    prefetcher = make_prefetcher(loader)
+    assert prefetcher.run_once() == [(2024, 'Test Grand Prix', 'Qualifying')]
+    assert (2024, 'Test Grand Prix', 'Race') in prefetcher.failed
+
+    published['Race'] = True
+    assert prefetcher.run_once() == [(2024, 'Test Grand Prix', 'Race')]
+    assert prefetcher.failed == {}
+
+
+def test_session_without_telemetry_is_failed():
+    prefetcher = make_prefetcher(lambda year, event_name, session: StandInSession(telemetry=False))
+    assert prefetcher.run_once() == []
+    assert len(prefetcher.failed) == 2